@@ -7,6 +7,7 @@ import textwrap
 from connectors.pinecone_api import PineconeClient
 from connectors.openai_api import OpenAIClient
 from connectors.notion_api import NotionClient
+from connectors.resume_store import get_default_store
 from feedback_loop import FeedbackLoop
 from matcher import calculate_final_score
 # from jd_parser.pipeline import JDPipeline # Moved to after patch
@@ -21,6 +22,7 @@ import jd_analyzer_v3
 from resume_scoring import calculate_rpl
 from explanation_engine import generate_explanation
 from search_pipeline_v3 import SearchPipelineV3
+from search_cache import get_search_cache
 import altair as alt # Visualization
 import hashlib # For history
 import os
@@ -387,6 +389,7 @@ with st.sidebar:
         clear_analysis_cache()
         st.cache_data.clear()
         st.cache_resource.clear()
+        get_search_cache().clear()
         st.session_state.clear()
         st.rerun()
 
@@ -637,12 +640,31 @@ def get_role_aliases(role_name):
             
     return []
 def get_notion_url(notion_client, page_id: str) -> str:
+    # Local resume store first (filled by ingest); Notion only for pages it doesn't know yet
+    store = get_default_store()
+    url = store.get_url(page_id) if store else None
+    if url:
+        return url
     try:
         page = notion_client.get_page(page_id)
-        return page.get("url", f"https://www.notion.so/{page_id.replace('-', '')}")
+        url = page.get("url")
+        if store and url:
+            store.put(page_id, url=url, last_edited_time=page.get("last_edited_time"))
+        return url or f"https://www.notion.so/{page_id.replace('-', '')}"
     except:
         return f"https://www.notion.so/{page_id.replace('-', '')}"
 
+def get_resume_text(notion_client, page_id: str) -> str:
+    """Resume body for RAG: local store, else live Notion fetch (written back to the store)."""
+    store = get_default_store()
+    text = store.get_text(page_id) if store else None
+    if text is not None:
+        return text
+    text = notion_client.get_page_full_text(page_id)
+    if store and text:
+        store.put(page_id, text)
+    return text
+
 # --- Helper: RAG Cache ---
 @st.cache_data(ttl=3600, show_spinner=False)
 def get_rag_recommendation(page_id: str, jd_summary: str, candidate_name: str, context_text: str) -> str:
@@ -755,6 +777,7 @@ with col_sidebar:
         st.session_state.pipeline_logs = []
         st.cache_data.clear()
         st.cache_resource.clear()
+        get_search_cache().clear()
         st.toast("Cache Cleared!", icon="🗑️")
         st.rerun()
 
@@ -1120,20 +1143,36 @@ with col_main:
                     # Text for embedding
                     query_text = f"Role: {role_vec}, Skills: {', '.join(must_vec)}, Context: {', '.join(domain_vec)}"
                     
-                    query_vector = openai.embed_content(query_text)
-                    
-                    # 4. Run Pipeline V3
-                    pipeline = SearchPipelineV3(pinecone)
-                    
-                    # Use Strategy Top-K
+                    # Use Strategy Top-K (retrieval) and Rerank (candidates kept for display)
                     top_k_val = st.session_state.search_strategy.get("top_k", 300)
+                    rerank_val = st.session_state.search_strategy.get("rerank")
                     
-                    # Execute (Unpack Tuple)
-                    raw_results, trace_log = pipeline.run(
-                        jd_analysis=st.session_state.analysis_data_v3,
-                        query_vector=query_vector,
-                        top_k=top_k_val
+                    # [Cache] Same analysis + strategy + index version -> reuse results (no embed / no query)
+                    # Same namespace lookup run() queries with (cached per index)
+                    pipeline = SearchPipelineV3(pinecone)
+                    search_cache = get_search_cache()
+                    search_key = search_cache.make_key(
+                        st.session_state.analysis_data_v3, query_text, top_k_val, rerank_val,
+                        namespace=pipeline.get_namespaces(), host=getattr(pinecone, "host", "")
                     )
+                    cached = search_cache.get(search_key)
+                    
+                    if cached:
+                        raw_results, trace_log = cached
+                        trace_log["cache"] = "hit"
+                    else:
+                        query_vector = openai.embed_content(query_text)
+                        
+                        # 4. Run Pipeline V3
+                        # Execute (Unpack Tuple)
+                        raw_results, trace_log = pipeline.run(
+                            jd_analysis=st.session_state.analysis_data_v3,
+                            query_vector=query_vector,
+                            top_k=top_k_val,
+                            top_n=rerank_val
+                        )
+                        if not trace_log.get("error"):
+                            search_cache.put(search_key, raw_results, trace_log)
                     
                     # Store Trace
                     st.session_state.latest_trace_log = trace_log
@@ -1142,21 +1181,25 @@ with col_main:
                     # Current user cutline
                     current_cut = st.session_state.get("rpl_cutline", 45)
                     
+                    # Statistics from the pre-truncation scores (raw_results may be cut to the rerank top-N)
+                    stat_scores = trace_log.get("rpl_scores")
+                    if stat_scores is None:
+                        stat_scores = [r['rpl_score'] for r in raw_results]
                     save_jd_rpl_history(
                         jd_text=st.session_state.jd_text,
                         jd_analysis=st.session_state.analysis_data_v3,
-                        results=raw_results,
+                        results=[{"rpl_score": s} for s in stat_scores],
                         cutline=current_cut
                     )
                     
                     # Recommendation Logic (Optimized for Low Sample)
                     rec_cut = 55
-                    if len(raw_results) < 20:
+                    if len(stat_scores) < 20:
                         rec_cut = 40 # Lower if few candidates
                     else:
                         rec_cut = recommend_rpl_cutline(
                             st.session_state.analysis_data_v3, 
-                            [r['rpl_score'] for r in raw_results]
+                            stat_scores
                         )
                     st.session_state.recommended_cutline = rec_cut
                     
@@ -1401,7 +1444,7 @@ with col_main:
                         
                         if page_id:
                             try:
-                                full_text = notion.get_page_full_text(page_id)
+                                full_text = get_resume_text(notion, page_id)
                             except: pass
                         
                         context = full_text[:3000] if full_text else str(data)
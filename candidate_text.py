@@ -0,0 +1,76 @@
+class CandidateText:
+    """
+    Normalized (lowercased) views of one candidate's metadata, built once per match
+    and shared by every scorer/filter instead of re-stringifying the dict each time.
+    Matching semantics stay those of the original code: `contains` is substring
+    containment over str(metadata).lower(), `items` is exact membership for list fields.
+    Also behaves like the metadata dict for .get(), so it can be passed to
+    custom_logic functions written against plain metadata.
+    """
+    __slots__ = ("metadata", "_text", "_fields", "_items")
+
+    def __init__(self, metadata):
+        self.metadata = metadata if metadata is not None else {}
+        self._text = None
+        self._fields = {}
+        self._items = {}
+
+    @classmethod
+    def of(cls, obj):
+        return obj if isinstance(obj, CandidateText) else cls(obj)
+
+    def get(self, key, default=None):
+        return self.metadata.get(key, default)
+
+    @property
+    def text(self):
+        """Whole metadata as one lowercased string (same basis as str(metadata).lower())."""
+        if self._text is None:
+            self._text = str(self.metadata).lower()
+        return self._text
+
+    def contains(self, keyword):
+        return str(keyword).lower() in self.text
+
+    def field(self, name):
+        """Lowercased string of one field; list fields are joined with ' | '."""
+        value = self._fields.get(name)
+        if value is None:
+            raw = self.metadata.get(name)
+            if raw is None:
+                value = ""
+            elif isinstance(raw, list):
+                value = " | ".join(str(v) for v in raw).lower()
+            else:
+                value = str(raw).lower()
+            self._fields[name] = value
+        return value
+
+    def compact(self, name):
+        """field() without spaces (e.g. 'Product Manager' -> 'productmanager')."""
+        key = name + "\x00compact"
+        value = self._fields.get(key)
+        if value is None:
+            value = self.field(name).replace(" ", "")
+            self._fields[key] = value
+        return value
+
+    def items(self, name):
+        """Lowercased elements of a list field as a set (exact membership)."""
+        value = self._items.get(name)
+        if value is None:
+            raw = self.metadata.get(name) or []
+            if not isinstance(raw, list):
+                raw = [raw]
+            value = frozenset(str(v).lower() for v in raw)
+            self._items[name] = value
+        return value
+
+
+def candidate_text(cand):
+    """CandidateText for a pipeline candidate dict ({'data': metadata, ...}), built once and kept on it."""
+    text = cand.get("text")
+    if text is None:
+        text = CandidateText(cand.get("data"))
+        cand["text"] = text
+    return text
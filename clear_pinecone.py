@@ -2,6 +2,7 @@
 import json
 import os
 from connectors.pinecone_api import PineconeClient
+from search_cache import bump_index_version
 
 def main():
     if not os.path.exists("secrets.json"):
@@ -24,6 +25,7 @@ def main():
         try:
             # Pinecone delete_all=True
             client.index.delete(delete_all=True)
+            bump_index_version("clear_pinecone")
             print("✅ Index Cleared.")
         except Exception as e:
             print(f"Error clearing index: {e}")
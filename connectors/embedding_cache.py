@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import hashlib
+import threading
+import time
+from array import array
+
+DEFAULT_CACHE_PATH = os.environ.get("EMBEDDING_CACHE_PATH", "embedding_cache.db")
+DEFAULT_MAX_ENTRIES = 200000  # ~600MB at 768 dims (float32)
+
+
+class EmbeddingCache:
+    """
+    Persistent content-addressed embedding cache (SQLite, float32 blobs).
+    Keyed by hash(model, dimensions, text) with size-bounded LRU eviction.
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON embeddings(last_access)")
+        self._conn.commit()
+        self._writes_since_evict = 0
+
+    @staticmethod
+    def make_key(model, dimensions, text):
+        raw = f"{model}\x1f{dimensions or ''}\x1f{text}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    def get(self, model, dimensions, text):
+        return self.get_many(model, dimensions, [text])[0]
+
+    def get_many(self, model, dimensions, texts):
+        """Returns a list aligned with `texts` (None for misses)."""
+        keys = [self.make_key(model, dimensions, t) for t in texts]
+        found = {}
+        with self._lock:
+            # SQLite limits bound parameters per statement; query in chunks
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = blob
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, k) for k in found]
+                )
+                self._conn.commit()
+
+        results = []
+        for key in keys:
+            blob = found.get(key)
+            if blob is None:
+                results.append(None)
+            else:
+                vec = array("f")
+                vec.frombytes(blob)
+                results.append(vec.tolist())
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return results
+
+    def put(self, model, dimensions, text, vector):
+        self.put_many(model, dimensions, [text], [vector])
+
+    def put_many(self, model, dimensions, texts, vectors):
+        now = time.time()
+        rows = [
+            (self.make_key(model, dimensions, t), array("f", v).tobytes(), now)
+            for t, v in zip(texts, vectors) if v
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+            self._writes_since_evict += len(rows)
+            if self._writes_since_evict >= 1000:
+                self._evict()
+
+    def _evict(self):
+        """Drops least-recently-used entries beyond max_entries (caller holds lock)."""
+        self._writes_since_evict = 0
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN ("
+                " SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)", (overflow,)
+            )
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "entries": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0
+        }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+def get_default_cache():
+    """Shared process-wide cache used by the embedding clients. None if unavailable."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = EmbeddingCache()
+            except Exception as e:
+                print(f"[EmbeddingCache] Disabled: {e}")
+                _default_cache = False
+        return _default_cache or None
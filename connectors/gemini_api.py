@@ -1,12 +1,14 @@
 
 import json
-import urllib.request
 import urllib.error
 import time
+from connectors.embedding_cache import get_default_cache
+from connectors.http_transport import get_transport
 
 class GeminiClient:
-    def __init__(self, api_key):
+    def __init__(self, api_key, cache=True, transport=None):
         self.api_key = api_key
+        self.transport = transport or get_transport()
         # Priority list of configurations to try
         self.configs = [
             {"model": "models/text-embedding-004", "version": "v1beta", "supports_task_type": True},
@@ -14,6 +16,8 @@ class GeminiClient:
             {"model": "models/embedding-001", "version": "v1", "supports_task_type": False}
         ]
         self.working_config = None # Will be set after first successful call
+        # Embedding cache: True -> shared on-disk cache, False/None -> disabled, or an EmbeddingCache
+        self.cache = get_default_cache() if cache is True else (cache or None)
 
     def _make_request(self, text, config, task_type):
         model = config["model"]
@@ -31,17 +35,43 @@ class GeminiClient:
             payload["taskType"] = task_type
             
         data = json.dumps(payload).encode('utf-8')
-        req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
         
-        with urllib.request.urlopen(req) as response:
+        with self.transport.request("POST", url, data=data, headers={"Content-Type": "application/json"}) as response:
             return json.loads(response.read().decode('utf-8'))
 
+    @staticmethod
+    def _cache_key(config, task_type):
+        """Cache model key of a config (used for both lookup and write)."""
+        return f"{config['model']}:{task_type}"
+
     def embed_content(self, text, task_type="RETRIEVAL_DOCUMENT"):
+        # 0. Cache lookup: the working model if known, else every config in priority order
+        #    (a new process doesn't know yet which model will answer)
+        if self.cache and text:
+            for config in ([self.working_config] if self.working_config else self.configs):
+                cached = self.cache.get(self._cache_key(config, task_type), None, text)
+                if cached:
+                    return cached
+
+        vals = self._embed_remote(text, task_type)
+        if vals:
+            if self.cache and text:
+                self.cache.put(self._cache_key(self.working_config, task_type), None, text, vals)
+            return vals
+
+        print("\n[WARN] Switching to MOCK embedding (Random Values) to allow system testing.")
+        # Return a 768-dimensional random vector (standard size for text-embedding-004/001)
+        import random
+        return [random.uniform(-0.1, 0.1) for _ in range(768)]
+
+    def _embed_remote(self, text, task_type):
         # 1. If we already know what works, use it
         if self.working_config:
             try:
                 result = self._make_request(text, self.working_config, task_type)
-                return result.get('embedding', {}).get('values')
+                vals = result.get('embedding', {}).get('values')
+                if vals:
+                    return vals
             except Exception as e:
                 print(f"[Warn] Config {self.working_config['model']} failed: {e}. Retrying discovery...")
                 self.working_config = None # Reset and fall through to discovery
@@ -67,11 +97,7 @@ class GeminiClient:
         print(f"[CRITICAL] All Gemini embedding models failed. Details below:")
         for e in errors:
             print(f" - {e}")
-            
-        print("\n[WARN] Switching to MOCK embedding (Random Values) to allow system testing.")
-        # Return a 768-dimensional random vector (standard size for text-embedding-004/001)
-        import random
-        return [random.uniform(-0.1, 0.1) for _ in range(768)]
+        return None
 
 if __name__ == "__main__":
     # Test block
@@ -0,0 +1,186 @@
+import io
+import gzip
+import time
+import threading
+import queue
+import http.client
+import urllib.error
+from urllib.parse import urlsplit
+from connectors.rate_limit import get_scheduler, service_for_host, is_retryable, MAX_RETRIES
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 60
+
+# Errors that mean a pooled keep-alive connection went stale before we used it
+_STALE_ERRORS = (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                 ConnectionResetError, BrokenPipeError)
+
+
+class Response:
+    """Fully-read HTTP response. Mirrors the parts of urlopen()'s response we use."""
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def read(self):
+        return self.body
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _HostPool:
+    def __init__(self, scheme, host, port, size, timeout):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+
+    def new_connection(self):
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def acquire(self):
+        """Returns (connection, reused)."""
+        self.slots.acquire()
+        try:
+            return self.idle.get_nowait(), True
+        except queue.Empty:
+            return self.new_connection(), False
+
+    def release(self, conn, reusable):
+        if reusable:
+            self.idle.put(conn)
+        else:
+            conn.close()
+        self.slots.release()
+
+
+class HTTPTransport:
+    """
+    Shared HTTP transport with per-host persistent (keep-alive) connection pools.
+    Requests to known providers go through the rate-limit scheduler and are retried
+    with Retry-After aware, jittered backoff: 429 always, 502/503/504 only for idempotent
+    requests (see rate_limit.is_retryable).
+    Raises urllib.error.HTTPError on 4xx/5xx so callers keep their urllib error handling.
+    """
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, scheduler=None):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.scheduler = scheduler or get_scheduler()
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def _get_pool(self, scheme, host, port):
+        key = (scheme, host, port)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = _HostPool(scheme, host, port, self.pool_size, self.timeout)
+                self._pools[key] = pool
+            return pool
+
+    def request(self, method, url, data=None, headers=None):
+        parts = urlsplit(url)
+        scheme = parts.scheme or "https"
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        req_headers = {"Accept-Encoding": "gzip", "Connection": "keep-alive"}
+        req_headers.update(headers or {})
+
+        pool = self._get_pool(scheme, parts.hostname, port)
+        service = service_for_host(parts.hostname)
+
+        attempt = 0
+        while True:
+            if service:
+                self.scheduler.acquire(service)
+            status, resp_headers, body = self._request_once(pool, method, path, data, req_headers)
+            if service:
+                self.scheduler.observe(service, resp_headers)
+
+            if service and attempt < MAX_RETRIES and is_retryable(status, method, parts.path):
+                delay = self.scheduler.backoff_delay(attempt, resp_headers)
+                attempt += 1
+                if status == 429:
+                    print(f"[RateLimit] {service} 429, backing off {delay:.1f}s (attempt {attempt}/{MAX_RETRIES})")
+                    self.scheduler.on_throttled(service, delay)
+                else:
+                    time.sleep(delay)
+                continue
+            break
+
+        if status >= 400:
+            raise urllib.error.HTTPError(url, status, http.client.responses.get(status, ""),
+                                         resp_headers, io.BytesIO(body))
+        return Response(status, resp_headers, body)
+
+    def _request_once(self, pool, method, path, data, headers):
+        conn, reused = pool.acquire()
+        try:
+            try:
+                status, resp_headers, body, will_close = self._send(conn, method, path, data, headers)
+            except _STALE_ERRORS:
+                if not reused:
+                    raise
+                # Server closed the idle keep-alive connection; retry once on a fresh one
+                conn.close()
+                conn = pool.new_connection()
+                status, resp_headers, body, will_close = self._send(conn, method, path, data, headers)
+        except Exception:
+            pool.release(conn, reusable=False)
+            raise
+        pool.release(conn, reusable=not will_close)
+        return status, resp_headers, body
+
+    def _send(self, conn, method, path, data, headers):
+        conn.request(method, path, body=data, headers=headers)
+        resp = conn.getresponse()
+        body = resp.read()
+        if (resp.getheader("Content-Encoding") or "").lower() == "gzip":
+            body = gzip.decompress(body)
+        return resp.status, resp.headers, body, resp.will_close
+
+    def close(self):
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools = {}
+        for pool in pools:
+            while True:
+                try:
+                    pool.idle.get_nowait().close()
+                except queue.Empty:
+                    break
+
+
+_default_transport = None
+_default_lock = threading.Lock()
+
+def get_transport():
+    """Process-wide transport shared by all connectors."""
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = HTTPTransport()
+        return _default_transport
+
+def configure_transport(pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+    """Replaces the shared transport (e.g. larger pools for bulk ingest)."""
+    global _default_transport
+    with _default_lock:
+        if _default_transport is not None:
+            _default_transport.close()
+        _default_transport = HTTPTransport(pool_size=pool_size, timeout=timeout)
+        return _default_transport
@@ -0,0 +1,240 @@
+import os
+import json
+import threading
+import numpy as np
+from connectors.metadata_filter import ColumnStore, compile_filter
+
+
+class _Namespace:
+    """Rows of one namespace: normalized float32 matrix + ids + metadata."""
+    def __init__(self, dim, capacity=1024):
+        self.dim = dim
+        self.matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self.raw_norms = np.zeros(capacity, dtype=np.float32)  # To return original values from fetch()
+        self.ids = []
+        self.metadata = []
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.row_of = {}
+        self._store = None  # Columnar metadata view, rebuilt after writes
+
+    def column_store(self):
+        if self._store is None or self._store.n != self.size:
+            self._store = ColumnStore(self.metadata)
+        return self._store
+
+    @property
+    def size(self):
+        return len(self.ids)
+
+    def _grow(self, needed):
+        capacity = self.matrix.shape[0]
+        if needed <= capacity:
+            return
+        new_cap = max(needed, capacity * 2)
+        matrix = np.zeros((new_cap, self.dim), dtype=np.float32)
+        matrix[:self.size] = self.matrix[:self.size]
+        norms = np.zeros(new_cap, dtype=np.float32)
+        norms[:self.size] = self.raw_norms[:self.size]
+        alive = np.zeros(new_cap, dtype=bool)
+        alive[:self.size] = self.alive[:self.size]
+        self.matrix, self.raw_norms, self.alive = matrix, norms, alive
+
+    def upsert(self, vec_id, values, metadata):
+        vec = np.asarray(values, dtype=np.float32)
+        if vec.shape != (self.dim,):
+            raise ValueError(f"Vector dimension {vec.shape} does not match index dimension {self.dim}")
+        norm = float(np.linalg.norm(vec)) or 1.0
+        row = self.row_of.get(vec_id)
+        if row is None:
+            row = self.size
+            self._grow(row + 1)
+            self.ids.append(vec_id)
+            self.metadata.append(metadata or {})
+            self.row_of[vec_id] = row
+        else:
+            self.metadata[row] = metadata or {}
+        self._store = None
+        self.matrix[row] = vec / norm
+        self.raw_norms[row] = norm
+        self.alive[row] = True
+
+    def delete(self, vec_id):
+        row = self.row_of.pop(vec_id, None)
+        if row is not None:
+            self.alive[row] = False
+
+    def compact(self):
+        """Drops deleted rows (done on save so row numbers stay stable in memory)."""
+        keep = np.flatnonzero(self.alive[:self.size])
+        if len(keep) == self.size:
+            return
+        self.matrix = np.ascontiguousarray(self.matrix[keep])
+        self.raw_norms = self.raw_norms[keep]
+        self.alive = np.ones(len(keep), dtype=bool)
+        self.ids = [self.ids[i] for i in keep]
+        self.metadata = [self.metadata[i] for i in keep]
+        self.row_of = {vid: i for i, vid in enumerate(self.ids)}
+        self._store = None
+
+
+class LocalVectorIndex:
+    """
+    In-process drop-in for connectors.pinecone_api.PineconeClient.
+    Same upsert/query/fetch/delete signatures and response shapes; cosine similarity
+    over L2-normalized float32 rows with vectorized top-k (argpartition).
+    filter_meta is compiled to a boolean mask over columnar metadata before top-k.
+    Persist with save(path) and reopen memory-mapped with LocalVectorIndex.load(path).
+    """
+    def __init__(self, dimension=768):
+        self.dimension = dimension
+        self.namespaces = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _ns_key(namespace):
+        return namespace or ""
+
+    def _get_ns(self, namespace, create=False):
+        key = self._ns_key(namespace)
+        ns = self.namespaces.get(key)
+        if ns is None and create:
+            ns = _Namespace(self.dimension)
+            self.namespaces[key] = ns
+        return ns
+
+    def upsert(self, vectors, namespace="ns1"):
+        """
+        Upserts vectors.
+        vectors: List of dicts [{'id': 'id1', 'values': [0.1, ...], 'metadata': {...}}]
+        """
+        with self._lock:
+            ns = self._get_ns(namespace, create=True)
+            for v in vectors:
+                ns.upsert(v["id"], v["values"], v.get("metadata"))
+        return {"upsertedCount": len(vectors)}
+
+    def query(self, vector, top_k=10, filter_meta=None, namespace="ns1"):
+        """
+        Queries the index. Returns {'matches': [{'id', 'score', 'metadata'}], 'namespace': ...}
+        """
+        with self._lock:
+            ns = self._get_ns(namespace)
+            if ns is None or ns.size == 0:
+                return {"matches": [], "namespace": self._ns_key(namespace)}
+
+            q = np.asarray(vector, dtype=np.float32)
+            q = q / (float(np.linalg.norm(q)) or 1.0)
+
+            n = ns.size
+            candidates = ns.alive[:n].copy()
+            if filter_meta:
+                candidates &= self._filter_mask(ns, filter_meta)
+            rows = np.flatnonzero(candidates)
+            if len(rows) == 0:
+                return {"matches": [], "namespace": self._ns_key(namespace)}
+
+            # One mat-vec over the whole namespace; the mask picks eligible rows before top-k
+            scores = (ns.matrix[:n] @ q)[rows]
+            k = min(top_k, len(rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            matches = []
+            for i in top:
+                row = rows[i]
+                matches.append({
+                    "id": ns.ids[row],
+                    "score": float(scores[i]),
+                    "metadata": ns.metadata[row]
+                })
+            return {"matches": matches, "namespace": self._ns_key(namespace)}
+
+    def _filter_mask(self, ns, filter_meta):
+        # Columnar predicate evaluation ($eq/$ne/$gt/$gte/$lt/$lte/$in/$nin/$and/$or)
+        return compile_filter(filter_meta)(ns.column_store())
+
+    def fetch(self, ids, namespace="ns1"):
+        """
+        Fetches vectors by ID.
+        """
+        with self._lock:
+            ns = self._get_ns(namespace)
+            found = {}
+            if ns is not None:
+                for vid in ids:
+                    row = ns.row_of.get(vid)
+                    if row is not None:
+                        found[vid] = {
+                            "id": vid,
+                            "values": (ns.matrix[row] * ns.raw_norms[row]).tolist(),
+                            "metadata": ns.metadata[row]
+                        }
+            return {"vectors": found, "namespace": self._ns_key(namespace)}
+
+    def delete(self, ids=None, delete_all=False, namespace="ns1"):
+        """
+        Deletes vectors by ID or Delete All.
+        """
+        with self._lock:
+            if delete_all:
+                self.namespaces.pop(self._ns_key(namespace), None)
+                return {}
+            if not ids:
+                return None
+            ns = self._get_ns(namespace)
+            if ns is not None:
+                for vid in ids:
+                    ns.delete(vid)
+            return {}
+
+    def describe_index_stats(self):
+        with self._lock:
+            return {
+                "dimension": self.dimension,
+                "namespaces": {key: {"vectorCount": len(ns.row_of)} for key, ns in self.namespaces.items()},
+                "totalVectorCount": sum(len(ns.row_of) for ns in self.namespaces.values())
+            }
+
+    # --- Persistence ---
+    def save(self, path):
+        """Writes one <ns>.f32 matrix file + <ns>.json (ids/metadata) per namespace."""
+        with self._lock:
+            os.makedirs(path, exist_ok=True)
+            manifest = {"dimension": self.dimension, "namespaces": {}}
+            for i, (key, ns) in enumerate(self.namespaces.items()):
+                ns.compact()
+                base = f"ns_{i}"
+                # Detach from any memory-mapped file before rewriting it
+                ns.matrix = np.array(ns.matrix[:ns.size], dtype=np.float32)
+                tmp = os.path.join(path, base + ".f32.tmp")
+                ns.matrix.tofile(tmp)
+                os.replace(tmp, os.path.join(path, base + ".f32"))
+                with open(os.path.join(path, base + ".json"), "w", encoding="utf-8") as f:
+                    json.dump({"ids": ns.ids, "metadata": ns.metadata,
+                               "norms": ns.raw_norms[:ns.size].tolist()}, f, ensure_ascii=False)
+                manifest["namespaces"][key] = {"file": base, "count": ns.size}
+            with open(os.path.join(path, "index.json"), "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+
+    @classmethod
+    def load(cls, path):
+        """Opens a saved index; matrices are memory-mapped (copy-on-write)."""
+        with open(os.path.join(path, "index.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        index = cls(dimension=manifest["dimension"])
+        for key, info in manifest["namespaces"].items():
+            with open(os.path.join(path, info["file"] + ".json"), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            ns = _Namespace(index.dimension, capacity=1)
+            count = info["count"]
+            if count:
+                ns.matrix = np.memmap(os.path.join(path, info["file"] + ".f32"), dtype=np.float32,
+                                      mode="c", shape=(count, index.dimension))
+            ns.raw_norms = np.asarray(data.get("norms") or [1.0] * count, dtype=np.float32)
+            ns.ids = data["ids"]
+            ns.metadata = data["metadata"]
+            ns.alive = np.ones(max(count, 1), dtype=bool)
+            ns.row_of = {vid: i for i, vid in enumerate(ns.ids)}
+            index.namespaces[key] = ns
+        return index
+
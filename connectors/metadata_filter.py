@@ -0,0 +1,212 @@
+import numpy as np
+
+# Pinecone filter grammar supported here
+COMPARISON_OPS = ("$eq", "$ne", "$gt", "$gte", "$lt", "$lte", "$in", "$nin")
+LOGICAL_OPS = ("$and", "$or")
+
+
+def match_row(meta, flt):
+    """Row-wise evaluation of a Pinecone-style metadata filter (reference semantics)."""
+    for key, cond in flt.items():
+        if key == "$and":
+            if not all(match_row(meta, c) for c in cond):
+                return False
+            continue
+        if key == "$or":
+            if not any(match_row(meta, c) for c in cond):
+                return False
+            continue
+        value = meta.get(key)
+        if not isinstance(cond, dict):
+            cond = {"$eq": cond}
+        for op, target in cond.items():
+            values = value if isinstance(value, list) else [value]
+            if op == "$eq" and target not in values:
+                return False
+            if op == "$ne" and target in values:
+                return False
+            if op == "$in" and not any(v in target for v in values):
+                return False
+            if op == "$nin" and any(v in target for v in values):
+                return False
+            if op in ("$gt", "$gte", "$lt", "$lte"):
+                if not _is_number(value) or not _is_number(target):
+                    return False
+                if op == "$gt" and not value > target: return False
+                if op == "$gte" and not value >= target: return False
+                if op == "$lt" and not value < target: return False
+                if op == "$lte" and not value <= target: return False
+    return True
+
+
+def _is_number(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+class _NumericColumn:
+    """float64 values, NaN where the field is missing."""
+    def __init__(self, values):
+        self.values = np.array([v if _is_number(v) else np.nan for v in values], dtype=np.float64)
+        self.present = ~np.isnan(self.values)
+
+    def evaluate(self, op, target):
+        v = self.values
+        if op in ("$in", "$nin"):
+            nums = [t for t in target if _is_number(t)]
+            hit = np.isin(v, nums) if nums else np.zeros(len(v), dtype=bool)
+            return hit if op == "$in" else ~hit
+        if op in ("$eq", "$ne"):
+            hit = (v == target) if _is_number(target) else np.zeros(len(v), dtype=bool)
+            return hit if op == "$eq" else ~hit
+        if not _is_number(target):
+            return np.zeros(len(v), dtype=bool)
+        with np.errstate(invalid="ignore"):
+            if op == "$gt": return v > target
+            if op == "$gte": return v >= target
+            if op == "$lt": return v < target
+            if op == "$lte": return v <= target
+        raise ValueError(f"Unsupported filter operator: {op}")
+
+
+class _DictColumn:
+    """Dictionary-encoded scalar (string/bool) values; code -1 means missing."""
+    def __init__(self, values):
+        self.dictionary = {}
+        codes = np.full(len(values), -1, dtype=np.int32)
+        for i, v in enumerate(values):
+            if v is None:
+                continue
+            code = self.dictionary.get((type(v), v))
+            if code is None:
+                code = len(self.dictionary)
+                self.dictionary[(type(v), v)] = code
+            codes[i] = code
+        self.codes = codes
+
+    def _codes_for(self, targets):
+        return [self.dictionary[(type(t), t)] for t in targets if (type(t), t) in self.dictionary]
+
+    def evaluate(self, op, target):
+        n = len(self.codes)
+        if op in ("$eq", "$ne", "$in", "$nin"):
+            targets = target if op in ("$in", "$nin") else [target]
+            codes = self._codes_for(targets)
+            hit = np.isin(self.codes, codes) if codes else np.zeros(n, dtype=bool)
+            return hit if op in ("$eq", "$in") else ~hit
+        return np.zeros(n, dtype=bool)  # Range ops never match non-numeric values
+
+
+class _MultiValueColumn:
+    """
+    List-valued field (e.g. domain, skills) as an inverted index:
+    value -> row ids. A boolean bitmap is materialized only for values a filter asks for.
+    """
+    def __init__(self, values):
+        self.n = len(values)
+        postings = {}
+        for i, v in enumerate(values):
+            for item in (v or []):
+                postings.setdefault((type(item), item), []).append(i)
+        self.postings = {k: np.asarray(rows, dtype=np.int64) for k, rows in postings.items()}
+
+    def _rows_any(self, targets):
+        mask = np.zeros(self.n, dtype=bool)
+        for t in targets:
+            rows = self.postings.get((type(t), t))
+            if rows is not None:
+                mask[rows] = True
+        return mask
+
+    def evaluate(self, op, target):
+        if op in ("$eq", "$ne", "$in", "$nin"):
+            targets = target if op in ("$in", "$nin") else [target]
+            hit = self._rows_any(targets)
+            return hit if op in ("$eq", "$in") else ~hit
+        return np.zeros(self.n, dtype=bool)
+
+
+class _RowColumn:
+    """Fallback for fields mixing types across rows: evaluates row by row."""
+    def __init__(self, key, metadata):
+        self.key = key
+        self.metadata = metadata
+
+    def evaluate(self, op, target):
+        flt = {self.key: {op: target}}
+        return np.fromiter((match_row(m, flt) for m in self.metadata), dtype=bool, count=len(self.metadata))
+
+
+class ColumnStore:
+    """
+    Columnar view over a list of metadata dicts, built lazily per field.
+    Numeric fields -> float arrays, scalar strings -> dictionary codes,
+    list fields -> inverted index (bitmap on demand).
+    """
+    def __init__(self, metadata):
+        self.metadata = metadata
+        self.n = len(metadata)
+        self._columns = {}
+
+    def column(self, key):
+        col = self._columns.get(key)
+        if col is None:
+            col = self._build(key)
+            self._columns[key] = col
+        return col
+
+    def _build(self, key):
+        values = [m.get(key) for m in self.metadata]
+        kinds = set()
+        for v in values:
+            if v is None:
+                continue
+            if isinstance(v, list):
+                kinds.add("list")
+            elif _is_number(v):
+                kinds.add("number")
+            else:
+                kinds.add("scalar")
+        if not kinds or kinds == {"number"}:
+            return _NumericColumn(values)
+        if kinds == {"scalar"}:
+            return _DictColumn(values)
+        if kinds == {"list"}:
+            return _MultiValueColumn(values)
+        return _RowColumn(key, self.metadata)
+
+
+def compile_filter(flt):
+    """
+    Compiles a Pinecone filter dict into a function ColumnStore -> boolean mask.
+    Compile once per query; evaluation is vectorized per referenced column.
+    """
+    parts = []
+    for key, cond in flt.items():
+        if key == "$and":
+            subs = [compile_filter(c) for c in cond]
+            parts.append(lambda store, subs=subs: _reduce(np.logical_and, subs, store, True))
+        elif key == "$or":
+            subs = [compile_filter(c) for c in cond]
+            parts.append(lambda store, subs=subs: _reduce(np.logical_or, subs, store, False))
+        elif key.startswith("$"):
+            raise ValueError(f"Unsupported filter operator: {key}")
+        else:
+            if not isinstance(cond, dict):
+                cond = {"$eq": cond}
+            for op, target in cond.items():
+                if op not in COMPARISON_OPS:
+                    raise ValueError(f"Unsupported filter operator: {op}")
+                parts.append(lambda store, key=key, op=op, target=target: store.column(key).evaluate(op, target))
+
+    def evaluate(store):
+        return _reduce(np.logical_and, parts, store, True)
+    return evaluate
+
+
+def _reduce(fn, subs, store, empty_value):
+    if not subs:
+        return np.full(store.n, empty_value, dtype=bool)
+    mask = subs[0](store)
+    for sub in subs[1:]:
+        mask = fn(mask, sub(store))
+    return mask
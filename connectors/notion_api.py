@@ -1,12 +1,20 @@
 
 import json
-import urllib.request
 import urllib.error
+import urllib.parse
 import time
+from concurrent.futures import ThreadPoolExecutor
+from connectors.http_transport import get_transport
+from connectors.notion_registry import DatabaseRegistry
+
+class NotionQueryError(Exception):
+    """A database query page failed; the listing is incomplete."""
+
 
 class NotionClient:
-    def __init__(self, token):
+    def __init__(self, token, transport=None):
         self.token = token
+        self.transport = transport or get_transport()
         self.headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
@@ -16,10 +24,9 @@ class NotionClient:
     def _request(self, method, endpoint, payload=None):
         url = f"https://api.notion.com/v1/{endpoint}"
         data = json.dumps(payload).encode('utf-8') if payload else None
-        req = urllib.request.Request(url, data=data, headers=self.headers, method=method)
         
         try:
-            with urllib.request.urlopen(req) as response:
+            with self.transport.request(method, url, data=data, headers=self.headers) as response:
                 return json.loads(response.read().decode('utf-8'))
         except urllib.error.HTTPError as e:
             print(f"Notion API Error {e.code}: {e.read().decode('utf-8')}")
@@ -48,51 +55,69 @@ class NotionClient:
         payload = {"properties": properties}
         return self._request("PATCH", f"pages/{page_id}", payload)
 
+    def get_database(self, db_id):
+        """Retrieves a Database object (title + property schema)."""
+        return self._request("GET", f"databases/{db_id}")
+
     def update_database(self, db_id, properties):
         """Updates database schema (e.g. adding properties)."""
         payload = {"properties": properties}
         return self._request("PATCH", f"databases/{db_id}", payload)
 
-    def query_database(self, db_id, limit=None, filter_criteria=None):
-        """Query database with pagination support."""
-        all_results = []
-        has_more = True
-        next_cursor = None
-        
-        while has_more:
-            payload = {}
-            if limit and not has_more: 
-                # Optimization: if limit reached in first page? No, let's keep it simple.
-                # If limit is specified and we have enough, break?
-                pass
-            
+    def _query_page(self, db_id, payload, filter_properties=None):
+        """One POST databases/{id}/query call (<= 100 pages)."""
+        endpoint = f"databases/{db_id}/query"
+        if filter_properties:
+            # Only return these properties (ids or names); the page objects shrink accordingly
+            endpoint += "?" + urllib.parse.urlencode([("filter_properties", p) for p in filter_properties])
+        res = self._request("POST", endpoint, payload)
+        if res is None:
+            # _request already printed the API/network error
+            raise NotionQueryError(f"Query of database {db_id} failed (cursor={payload.get('start_cursor')})")
+        return res
+
+    def iter_database(self, db_id, filter_criteria=None, sorts=None, filter_properties=None,
+                      limit=None, extract=False):
+        """
+        Streams the pages of a database query, following next_cursor.
+        The next page is requested in the background while the caller processes the
+        current one, so the first 100 rows are usable before the rest has downloaded.
+        extract=True yields extract_properties() dicts instead of raw page objects.
+        Raises NotionQueryError if any page fails, so a partial listing is never mistaken for a complete one.
+        """
+        def payload_for(cursor, fetched):
+            payload = {"page_size": min(100, limit - fetched) if limit else 100}
             if filter_criteria:
                 payload["filter"] = filter_criteria
-                
-            if next_cursor:
-                payload["start_cursor"] = next_cursor
-            
-            # Use default page size (100) or limit if small
-            if limit and limit < 100:
-                payload["page_size"] = limit
-            else:
-                 payload["page_size"] = 100
-                 
-            res = self._request("POST", f"databases/{db_id}/query", payload)
-            if not res:
-                break
-                
-            results = res.get('results', [])
-            all_results.extend(results)
-            
-            if limit and len(all_results) >= limit:
-                all_results = all_results[:limit]
-                break
-                
-            has_more = res.get('has_more', False)
-            next_cursor = res.get('next_cursor')
-            
-        return {"results": all_results}
+            if sorts:
+                payload["sorts"] = sorts
+            if cursor:
+                payload["start_cursor"] = cursor
+            return payload
+
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self._query_page, db_id, payload_for(None, 0), filter_properties)
+            while future is not None:
+                res = future.result()
+                results = res.get('results', [])
+                if limit:
+                    results = results[:limit - fetched]
+                fetched += len(results)
+
+                cursor = res.get('next_cursor')
+                future = None
+                if res.get('has_more') and cursor and not (limit and fetched >= limit):
+                    future = executor.submit(self._query_page, db_id, payload_for(cursor, fetched), filter_properties)
+
+                for page in results:
+                    yield self.extract_properties(page) if extract else page
+
+    def query_database(self, db_id, limit=None, filter_criteria=None, sorts=None, filter_properties=None):
+        """Fetches all matching pages as {"results": [...]}. Prefer iter_database for large DBs."""
+        print(f"  [Notion] Querying DB {db_id}...")
+        return {"results": list(self.iter_database(db_id, filter_criteria=filter_criteria, sorts=sorts,
+                                                   filter_properties=filter_properties, limit=limit))}
 
     def search_db_by_name(self, name):
         """Finds a database ID by its title."""
@@ -120,75 +145,58 @@ class NotionClient:
             
         return None
 
-    def query_database(self, db_id, limit=None, filter_criteria=None):
-        """Fetches pages from the database with pagination."""
-        url = f"https://api.notion.com/v1/databases/{db_id}/query"
-        results = []
-        has_more = True
+    # Block types whose rich_text is resume body text
+    TEXT_BLOCK_TYPES = ('paragraph', 'heading_1', 'heading_2', 'heading_3', 'bulleted_list_item',
+                        'numbered_list_item', 'to_do', 'toggle')
+    # Containers whose children belong to another page/database; never descended into
+    SKIP_CHILDREN_TYPES = ('child_page', 'child_database')
+
+    def iter_block_children(self, block_id):
+        """Yields every child block of a page/block, following next_cursor (100 per request)."""
         cursor = None
-        
-        print(f"  [Notion] Querying DB {db_id}...")
-        
-        while has_more:
-            payload = {"page_size": 100} # Max allowed by Notion API
+        while True:
+            url = f"https://api.notion.com/v1/blocks/{block_id}/children?page_size=100"
             if cursor:
-                payload["start_cursor"] = cursor
-            
-            if filter_criteria:
-                payload["filter"] = filter_criteria
-                
-            data = json.dumps(payload).encode('utf-8')
-            req = urllib.request.Request(url, data=data, headers=self.headers, method="POST")
-            
-            try:
-                with urllib.request.urlopen(req) as response:
-                    res_json = json.loads(response.read().decode('utf-8'))
-                    results.extend(res_json.get('results', []))
-                    
-                    has_more = res_json.get('has_more', False)
-                    cursor = res_json.get('next_cursor')
-                    
-                    if limit and len(results) >= limit:
-                        results = results[:limit]
-                        break
-                        
-                    # print(f"    - Fetched {len(results)} rows so far...")
-                    
-            except Exception as e:
-                print(f"Notion Query Error: {e}")
+                url += f"&start_cursor={cursor}"
+            with self.transport.request("GET", url, headers=self.headers) as response:
+                res = json.loads(response.read().decode('utf-8'))
+            for block in res.get('results', []):
+                yield block
+            cursor = res.get('next_cursor')
+            if not res.get('has_more') or not cursor:
                 break
-                
-        return {"results": results}
 
-    def get_page_full_text(self, page_id):
-        """Fetches all text content from a page's blocks."""
-        url = f"https://api.notion.com/v1/blocks/{page_id}/children?page_size=100"
-        req = urllib.request.Request(url, headers=self.headers, method="GET")
-        
+    @classmethod
+    def _block_text(cls, block):
+        btype = block.get('type')
+        if btype in cls.TEXT_BLOCK_TYPES:
+            rich_text = block.get(btype, {}).get('rich_text', [])
+            return "".join([t.get('plain_text', '') for t in rich_text])
+        return ""
+
+    def _collect_text(self, block_id, full_text, depth, max_depth):
+        for block in self.iter_block_children(block_id):
+            text_content = self._block_text(block)
+            if text_content.strip():
+                full_text.append(text_content)
+            # Nested content (toggles, list children, columns) follows its parent block
+            if (block.get('has_children') and depth < max_depth
+                    and block.get('type') not in self.SKIP_CHILDREN_TYPES):
+                self._collect_text(block['id'], full_text, depth + 1, max_depth)
+
+    def get_page_full_text(self, page_id, recursive=True, max_depth=3):
+        """
+        Fetches all text content from a page's blocks.
+        Follows pagination (pages with >100 blocks) and, if recursive, nested children.
+        Returns None if any request fails: a partial body must not pass for the real one.
+        """
         full_text = []
-        
         try:
-            with urllib.request.urlopen(req) as response:
-                res = json.loads(response.read().decode('utf-8'))
-                blocks = res.get('results', [])
-                
-                for block in blocks:
-                    btype = block['type']
-                    text_content = ""
-                    
-                    # Extract text based on block type
-                    if btype in ['paragraph', 'heading_1', 'heading_2', 'heading_3', 'bulleted_list_item', 'numbered_list_item', 'to_do', 'toggle']:
-                        rich_text = block[btype].get('rich_text', [])
-                        text_content = "".join([t['plain_text'] for t in rich_text])
-                        
-                    if text_content.strip():
-                        full_text.append(text_content)
-                        
+            self._collect_text(page_id, full_text, 0, max_depth if recursive else 0)
             return "\n".join(full_text)
-            
         except Exception as e:
             print(f"Error fetching page content for {page_id}: {e}")
-            return ""
+            return None
 
     def extract_properties(self, page):
         """Parses a Notion page into a simplified dictionary."""
@@ -237,43 +245,44 @@ class HeadhunterDB:
         with open(secrets_path, "r") as f:
             self.secrets = json.load(f)
         self.client = NotionClient(self.secrets["NOTION_API_KEY"])
+        # Database ids: secrets -> notion_registry.json -> search API (once)
+        self.registry = DatabaseRegistry(self.client, self.secrets)
         
-    def fetch_candidates(self, limit=50, filter_criteria=None):
-        # Prefer "Vector DB" for clean slate, fallback to "DB"
-        db_id = self.client.search_db_by_name("Vector DB")
-        if not db_id:
-             db_id = self.client.search_db_by_name("DB")
-             
+    def _candidate_db_id(self):
+        # Prefer "Vector DB" for clean slate, fallback to "DB" (see notion_registry.DATABASES)
+        db_id = self.registry.resolve("candidates")
         if not db_id:
             print("Database 'Vector DB' or 'DB' not found.")
-            return []
-            
+        return db_id
+
+    def iter_candidates(self, limit=None, filter_criteria=None, sorts=None, filter_properties=None):
+        """Streams candidates (extract_properties dicts) while later result pages are still downloading."""
+        db_id = self._candidate_db_id()
+        if not db_id:
+            return
         print(f"Fetching candidates from DB ({db_id})...")
-        # Use query_database (now supports pagination)
-        # Pass a large limit if we want all, e.g. 5000 or None for all
-        res = self.client.query_database(db_id, limit=limit, filter_criteria=filter_criteria)
-        candidates = []
-        if res and 'results' in res:
-            for page in res['results']:
-                candidates.append(self.client.extract_properties(page))
-        return candidates
+        yield from self.client.iter_database(db_id, filter_criteria=filter_criteria, sorts=sorts,
+                                            filter_properties=filter_properties, limit=limit, extract=True)
+
+    def fetch_candidates(self, limit=50, filter_criteria=None):
+        # limit=None for all candidates
+        return list(self.iter_candidates(limit=limit, filter_criteria=filter_criteria))
 
     def fetch_history(self, limit=100):
-        db_id = self.client.search_db_by_name("PROGRAM")
+        db_id = self.registry.resolve("history")
         if not db_id:
             print("Database 'PROGRAM' not found.")
             return []
             
         print(f"Fetching history from PROGRAM ({db_id})...")
-        res = self.client.query_database(db_id, limit)
-        history = []
-        if res:
-            for page in res['results']:
-                history.append(self.client.extract_properties(page))
-        return history
+        try:
+            return list(self.client.iter_database(db_id, limit=limit, extract=True))
+        except NotionQueryError as e:
+            print(f"[!] {e}")
+            return []
 
     def fetch_candidate_details(self, page_id):
-        """Fetches full text content for a specific candidate."""
+        """Fetches full text content for a specific candidate (None if the fetch failed)."""
         return self.client.get_page_full_text(page_id)
 
     def update_candidate(self, page_id, properties):
@@ -0,0 +1,102 @@
+import os
+import json
+import time
+import threading
+
+REGISTRY_PATH = os.environ.get("NOTION_REGISTRY_PATH", "notion_registry.json")
+VALIDATE_TTL = 24 * 3600  # Re-check a cached id (and refresh its schema) once a day
+
+# Logical database -> (secrets key, Notion titles to search for, in priority order)
+DATABASES = {
+    "candidates": ("NOTION_DATABASE_ID", ["Vector DB", "DB"]),
+    "history": ("NOTION_HISTORY_DATABASE_ID", ["PROGRAM"]),
+}
+
+
+class DatabaseRegistry:
+    """
+    Resolves logical database names ("candidates", "history") to Notion database ids:
+    secrets.json first, then a persisted lookup cache, and only then the (slow) search API.
+    Each entry also keeps a snapshot of the database's properties (name -> id/type).
+    """
+    def __init__(self, client, secrets=None, path=REGISTRY_PATH):
+        self.client = client
+        self.secrets = secrets or {}
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f).get("databases", {})
+            except Exception as e:
+                print(f"[Notion] Could not read {path} ({e}). Resolving databases again.")
+
+    def resolve(self, name):
+        """Database id for a logical name, or None if it can't be found."""
+        secret_key, titles = DATABASES[name]
+        db_id = self.secrets.get(secret_key)
+        if db_id:
+            return db_id
+
+        with self._lock:
+            entry = self.entries.get(name)
+        if entry and entry.get("source") == "search":
+            if time.time() - entry.get("checked_at", 0) < VALIDATE_TTL or self._refresh(name, entry["id"], "search"):
+                return entry["id"]
+            print(f"[Notion] Cached id for '{name}' is no longer valid. Searching again...")
+            self.invalidate(name)
+
+        for title in titles:
+            db_id = self.client.search_db_by_name(title)
+            if db_id:
+                self._refresh(name, db_id, "search")
+                return db_id
+        return None
+
+    def schema(self, name, refresh=False):
+        """Property snapshot {prop_name: {"id", "type"}} of a database ({} if unknown)."""
+        db_id = self.resolve(name)
+        if not db_id:
+            return {}
+        with self._lock:
+            entry = self.entries.get(name)
+        stale = (not entry or entry.get("id") != db_id
+                 or time.time() - entry.get("checked_at", 0) >= VALIDATE_TTL)
+        if refresh or stale:
+            self._refresh(name, db_id, entry["source"] if entry and entry.get("id") == db_id else "secrets")
+            with self._lock:
+                entry = self.entries.get(name)
+        return (entry or {}).get("properties", {})
+
+    def invalidate(self, name):
+        """Forgets a cached entry (e.g. after the database was moved or re-shared)."""
+        with self._lock:
+            removed = self.entries.pop(name, None)
+        if removed:
+            self.save()
+
+    def _refresh(self, name, db_id, source):
+        """GET databases/{id}: validates the id and snapshots its schema. False if not accessible."""
+        res = self.client.get_database(db_id)
+        if not res or res.get("object") != "database":
+            return False
+        with self._lock:
+            self.entries[name] = {
+                "id": db_id,
+                "source": source,
+                "title": "".join(t.get("plain_text", "") for t in res.get("title", [])),
+                "properties": {prop: {"id": p.get("id"), "type": p.get("type")}
+                               for prop, p in res.get("properties", {}).items()},
+                "checked_at": time.time(),
+            }
+        self.save()
+        return True
+
+    def save(self):
+        with self._lock:
+            data = {"databases": self.entries}
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
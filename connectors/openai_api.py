@@ -1,17 +1,21 @@
 
 import json
-import urllib.request
 import urllib.error
 import time
+from connectors.embedding_cache import get_default_cache
+from connectors.http_transport import get_transport
 
 class OpenAIClient:
-    def __init__(self, api_key):
+    def __init__(self, api_key, cache=True, transport=None):
         self.api_key = api_key
+        self.transport = transport or get_transport()
         self.url = "https://api.openai.com/v1/embeddings"
         self.model = "text-embedding-3-small"
         # CRITICAL: Match Pinecone's 768 dimension (User's current setup)
         # Default for 3-small is 1536, but it supports shortening.
         self.dimensions = 768 
+        # Embedding cache: True -> shared on-disk cache, False/None -> disabled, or an EmbeddingCache
+        self.cache = get_default_cache() if cache is True else (cache or None)
 
     def embed_content(self, text):
         """
@@ -20,34 +24,89 @@ class OpenAIClient:
         """
         if not text:
             return None
-            
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts, max_inputs=256, max_tokens=100000):
+        """
+        Generates embeddings for a list of texts, packing as many inputs per
+        request as the size budget allows. Cached texts are not re-sent.
+        Returns a list aligned with `texts` (None for empty or failed inputs).
+        """
+        results = [None] * len(texts)
+        pending = [i for i, t in enumerate(texts) if t]
+
+        if self.cache and pending:
+            cached = self.cache.get_many(self.model, self.dimensions, [texts[i] for i in pending])
+            for i, vec in zip(pending, cached):
+                results[i] = vec
+            pending = [i for i, vec in zip(pending, cached) if vec is None]
+
+        batch_idx, batch_tokens = [], 0
+
+        def flush():
+            batch = [texts[i] for i in batch_idx]
+            vectors = self._request_embeddings(batch)
+            if vectors:
+                for i, vec in zip(batch_idx, vectors):
+                    results[i] = vec
+                if self.cache:
+                    self.cache.put_many(self.model, self.dimensions, batch, vectors)
+
+        for i in pending:
+            est_tokens = self._estimate_tokens(texts[i])
+            if batch_idx and (len(batch_idx) >= max_inputs or batch_tokens + est_tokens > max_tokens):
+                flush()
+                batch_idx, batch_tokens = [], 0
+            batch_idx.append(i)
+            batch_tokens += est_tokens
+
+        if batch_idx:
+            flush()
+        return results
+
+    @staticmethod
+    def _estimate_tokens(text):
+        # Conservative estimate: Korean text tokenizes much denser than English (~4 chars/token)
+        return len(text) // 2 + 1
+
+    def _request_embeddings(self, inputs):
+        """
+        Sends one embeddings request for a list of inputs.
+        Returns vectors in input order, or None on failure.
+        """
         headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}"
         }
         
-        # OpenAI API Payload
+        # OpenAI API Payload (list form: one request, many inputs)
         payload = {
-            "input": text,
+            "input": inputs,
             "model": self.model,
             "dimensions": self.dimensions
         }
         
         data = json.dumps(payload).encode('utf-8')
-        req = urllib.request.Request(self.url, data=data, headers=headers)
         
         try:
-            with urllib.request.urlopen(req) as response:
+            with self.transport.request("POST", self.url, data=data, headers=headers) as response:
                 result = json.loads(response.read().decode('utf-8'))
-                # Extract embedding values from first element
-                if result.get("data"):
-                    return result["data"][0]["embedding"]
-                return None
+                items = result.get("data") or []
+                if len(items) != len(inputs):
+                    return None
+                # Response order is not guaranteed; each item carries its input index
+                items = sorted(items, key=lambda d: d.get("index", 0))
+                return [item["embedding"] for item in items]
                 
         except urllib.error.HTTPError as e:
             err_body = e.read().decode('utf-8')
             print(f"[OpenAI API Error] {e.code}: {err_body}")
             return None
+        except (OSError, ValueError) as e:
+            # Transport raises socket timeouts / connection errors (OSError); bad JSON -> ValueError
+            print(f"[OpenAI Network Error] {e}")
+            return None
+
     def get_chat_completion(self, system_prompt, user_message):
         """
         Generates a chat completion using OpenAI.
@@ -70,10 +129,9 @@ class OpenAIClient:
         }
         
         data = json.dumps(payload).encode('utf-8')
-        req = urllib.request.Request(url, data=data, headers=headers)
         
         try:
-            with urllib.request.urlopen(req) as response:
+            with self.transport.request("POST", url, data=data, headers=headers) as response:
                 result = json.loads(response.read().decode('utf-8'))
                 if result.get("choices"):
                     return result["choices"][0]["message"]["content"]
@@ -110,11 +168,9 @@ class OpenAIClient:
         }
         
         data = json.dumps(payload).encode('utf-8')
-        import urllib.request
-        req = urllib.request.Request(url, data=data, headers=headers)
         
         try:
-            with urllib.request.urlopen(req) as response:
+            with self.transport.request("POST", url, data=data, headers=headers) as response:
                 result = json.loads(response.read().decode('utf-8'))
                 if result.get("choices"):
                     content = result["choices"][0]["message"]["content"]
@@ -1,12 +1,17 @@
 
 import json
-import urllib.request
+import time
+import random
+import threading
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from connectors.http_transport import get_transport
 
 class PineconeClient:
-    def __init__(self, api_key, host):
+    def __init__(self, api_key, host, transport=None):
         self.api_key = api_key
         self.host = host
+        self.transport = transport or get_transport()
         self.headers = {
             "Api-Key": api_key,
             "Content-Type": "application/json",
@@ -26,10 +31,9 @@ class PineconeClient:
         }
         
         data = json.dumps(payload).encode('utf-8')
-        req = urllib.request.Request(url, data=data, headers=self.headers)
         
         try:
-            with urllib.request.urlopen(req) as response:
+            with self.transport.request("POST", url, data=data, headers=self.headers) as response:
                 return json.loads(response.read().decode('utf-8'))
         except urllib.error.HTTPError as e:
             print(f"Pinecone Upsert Error {e.code}: {e.read().decode('utf-8')}")
@@ -52,10 +56,9 @@ class PineconeClient:
             payload["filter"] = filter_meta
             
         data = json.dumps(payload).encode('utf-8')
-        req = urllib.request.Request(url, data=data, headers=self.headers)
         
         try:
-            with urllib.request.urlopen(req) as response:
+            with self.transport.request("POST", url, data=data, headers=self.headers) as response:
                 return json.loads(response.read().decode('utf-8'))
         except urllib.error.HTTPError as e:
             print(f"Pinecone Query Error {e.code}: {e.read().decode('utf-8')}")
@@ -67,15 +70,29 @@ class PineconeClient:
         """
         url = f"{self.host}/vectors/fetch?ids={','.join(ids)}&namespace={namespace}"
         
-        req = urllib.request.Request(url, headers=self.headers)
         
         try:
-            with urllib.request.urlopen(req) as response:
+            with self.transport.request("GET", url, headers=self.headers) as response:
                 return json.loads(response.read().decode('utf-8'))
         except urllib.error.HTTPError as e:
             print(f"Pinecone Fetch Error {e.code}: {e.read().decode('utf-8')}")
             return None
 
+    def describe_index_stats(self):
+        """
+        Returns index stats incl. per-namespace vector counts:
+        {'namespaces': {'ns1': {'vectorCount': 8000}}, 'dimension': 768, ...}
+        """
+        url = f"{self.host}/describe_index_stats"
+        data = json.dumps({}).encode('utf-8')
+        
+        try:
+            with self.transport.request("POST", url, data=data, headers=self.headers) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            print(f"Pinecone Stats Error {e.code}: {e.read().decode('utf-8')}")
+            return None
+
     def delete(self, ids=None, delete_all=False, namespace="ns1"):
         """
         Deletes vectors by ID or Delete All.
@@ -91,15 +108,121 @@ class PineconeClient:
             return None
             
         data = json.dumps(payload).encode('utf-8')
-        req = urllib.request.Request(url, data=data, headers=self.headers)
         
         try:
-            with urllib.request.urlopen(req) as response:
+            with self.transport.request("POST", url, data=data, headers=self.headers) as response:
                 return json.loads(response.read().decode('utf-8'))
         except urllib.error.HTTPError as e:
             print(f"Pinecone Delete Error {e.code}: {e.read().decode('utf-8')}")
             return None
 
+class BulkUpserter:
+    """
+    Buffers vectors across many add() calls and upserts them in batches split by
+    vector count and serialized payload size (Pinecone rejects requests over ~2MB).
+    Full batches are flushed in parallel; a failed batch fails on its own, so vectors
+    that already succeeded are never resent.
+    Retries (429/5xx with backoff) are left to the shared transport; max_retries adds
+    batch-level retries only for clients whose transport doesn't retry.
+    """
+    def __init__(self, client, namespace="ns1", max_vectors=100, max_bytes=1_800_000,
+                 max_workers=4, max_retries=0):
+        self.client = client
+        self.namespace = namespace
+        self.max_vectors = max_vectors
+        self.max_bytes = max_bytes
+        self.max_retries = max_retries
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.stats = {"requests": 0, "vectors": 0, "failed_vectors": 0, "retries": 0}
+        self._buffer = []        # [(vector, group)]
+        self._buffer_bytes = 0
+        self._futures = []
+        self._lock = threading.Lock()
+
+    def add(self, vectors, on_done=None):
+        """
+        Queues vectors for upsert. on_done(success) is called once every vector of
+        this call has been written (True) or any of them permanently failed (False).
+        """
+        if not vectors:
+            if on_done:
+                on_done(True)
+            return
+        group = {"remaining": len(vectors), "failed": False, "on_done": on_done}
+        ready = []
+        with self._lock:
+            for vec in vectors:
+                size = len(json.dumps(vec, separators=(",", ":"))) + 1
+                if self._buffer and (len(self._buffer) >= self.max_vectors
+                                     or self._buffer_bytes + size > self.max_bytes):
+                    ready.append(self._buffer)
+                    self._buffer, self._buffer_bytes = [], 0
+                self._buffer.append((vec, group))
+                self._buffer_bytes += size
+            for batch in ready:
+                self._futures.append(self.executor.submit(self._send, batch))
+
+    def flush(self):
+        """Sends whatever is buffered and waits for all in-flight batches."""
+        with self._lock:
+            if self._buffer:
+                self._futures.append(self.executor.submit(self._send, self._buffer))
+                self._buffer, self._buffer_bytes = [], 0
+            futures, self._futures = self._futures, []
+        for f in futures:
+            f.result()
+        return dict(self.stats)
+
+    def close(self):
+        stats = self.flush()
+        self.executor.shutdown(wait=True)
+        return stats
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _send(self, batch):
+        vectors = [vec for vec, _ in batch]
+        ok = False
+        for attempt in range(self.max_retries + 1):
+            try:
+                ok = self.client.upsert(vectors, namespace=self.namespace) is not None
+            except Exception as e:
+                print(f"Pinecone Bulk Upsert Error: {e}")
+                ok = False
+            with self._lock:
+                self.stats["requests"] += 1
+                if not ok and attempt < self.max_retries:
+                    self.stats["retries"] += 1
+            if ok:
+                break
+            if attempt < self.max_retries:
+                time.sleep(min(30, 2 ** attempt) + random.uniform(0, 1))
+
+        with self._lock:
+            if ok:
+                self.stats["vectors"] += len(vectors)
+            else:
+                self.stats["failed_vectors"] += len(vectors)
+            finished = []
+            for _, group in batch:
+                group["remaining"] -= 1
+                if not ok:
+                    group["failed"] = True
+                if group["remaining"] == 0 and group["on_done"]:
+                    finished.append(group)
+
+        # Callbacks run outside the lock (they may do I/O)
+        for group in finished:
+            try:
+                group["on_done"](not group["failed"])
+            except Exception as e:
+                print(f"BulkUpserter callback error: {e}")
+
 if __name__ == "__main__":
     # Test block
     with open("secrets.json", "r") as f:
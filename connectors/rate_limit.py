@@ -0,0 +1,224 @@
+import re
+import time
+import random
+import threading
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+# Default provider limits (requests per second, burst).
+# Notion: documented average of 3 rps. OpenAI: tier RPM / 60. Pinecone: per-index data plane.
+SERVICE_LIMITS = {
+    "notion": {"rate": 3.0, "burst": 3},
+    "openai": {"rate": 50.0, "burst": 20},
+    "pinecone": {"rate": 100.0, "burst": 50},
+    "gemini": {"rate": 25.0, "burst": 10},
+}
+
+# Host suffix -> service name (used by the HTTP transport)
+SERVICE_HOSTS = {
+    "api.notion.com": "notion",
+    "api.openai.com": "openai",
+    "pinecone.io": "pinecone",
+    "generativelanguage.googleapis.com": "gemini",
+}
+
+# 429 is retried for every method (the request was rejected, not applied).
+# 5xx only when repeating the call can't duplicate a write: a 502/504 may arrive after
+# e.g. Notion create_page was applied. 500 is never retried.
+RETRY_STATUS = (429, 502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE", "OPTIONS")
+# POST endpoints that only read (or overwrite by id) and are safe to repeat
+RETRYABLE_POST_PATHS = ("/query", "/v1/search", "/describe_index_stats", "/vectors/upsert", "/vectors/delete",
+                        "/v1/embeddings", ":embedContent", ":batchEmbedContents")
+MAX_RETRIES = 5
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+
+def is_retryable(status, method, path):
+    """Whether a response status may be retried for this method/path (path without query string)."""
+    if status == 429:
+        return True
+    if status not in RETRY_STATUS:
+        return False
+    method = (method or "GET").upper()
+    return method in IDEMPOTENT_METHODS or (method == "POST" and path.endswith(RETRYABLE_POST_PATHS))
+
+
+def service_for_host(host):
+    host = (host or "").lower()
+    for suffix, service in SERVICE_HOSTS.items():
+        if host == suffix or host.endswith("." + suffix):
+            return service
+    return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket. acquire() blocks until a token is available."""
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens=1.0):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.paused_until - now
+                if wait <= 0:
+                    if self.tokens >= tokens:
+                        self.tokens -= tokens
+                        return
+                    wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Blocks all callers for `seconds` (server asked us to back off)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class RateLimitScheduler:
+    """
+    Per-service token buckets plus throttle bookkeeping.
+    Reads Retry-After / x-ratelimit-* headers and computes jittered backoff.
+    """
+    def __init__(self, limits=None):
+        self.limits = dict(SERVICE_LIMITS)
+        self.limits.update(limits or {})
+        self.buckets = {name: TokenBucket(cfg["rate"], cfg["burst"]) for name, cfg in self.limits.items()}
+        self.throttle_counts = {name: 0 for name in self.limits}
+        self._lock = threading.Lock()
+
+    def acquire(self, service):
+        bucket = self.buckets.get(service)
+        if bucket:
+            bucket.acquire()
+
+    def throttles(self, services):
+        with self._lock:
+            return sum(self.throttle_counts.get(s, 0) for s in services)
+
+    def backoff_delay(self, attempt, headers=None):
+        """Server-provided delay if present, else exponential backoff with full jitter."""
+        server_delay = parse_retry_after(headers)
+        if server_delay is not None:
+            return min(server_delay, MAX_BACKOFF) + random.uniform(0, 0.5)
+        return random.uniform(0, min(MAX_BACKOFF, BASE_BACKOFF * (2 ** attempt)))
+
+    def on_throttled(self, service, delay):
+        with self._lock:
+            self.throttle_counts[service] = self.throttle_counts.get(service, 0) + 1
+        bucket = self.buckets.get(service)
+        if bucket:
+            bucket.pause(delay)
+
+    def observe(self, service, headers):
+        """Pre-emptively pauses a service when its rate-limit headers say the window is exhausted."""
+        bucket = self.buckets.get(service)
+        if not bucket or headers is None:
+            return
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is not None and remaining.strip() == "0":
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset:
+                    bucket.pause(reset)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit for a worker stage.
+    Halves once per throttle event of a watched service (not once per task that overlapped it),
+    grows by one after `increase_every` clean completions.
+    """
+    def __init__(self, scheduler, services, initial=4, minimum=1, maximum=16, increase_every=5):
+        self.scheduler = scheduler
+        self.services = services
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase_every = increase_every
+        self.active = 0
+        self._clean_streak = 0
+        self._seen_throttles = scheduler.throttles(services)  # Throttle count already acted on
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        with self._cond:
+            while self.active >= self.limit:
+                self._cond.wait()
+            self.active += 1
+        before = self.scheduler.throttles(self.services)
+        try:
+            yield
+        finally:
+            current = self.scheduler.throttles(self.services)
+            with self._cond:
+                self.active -= 1
+                if current > self._seen_throttles:
+                    # New throttle event(s): the first task to notice decreases, the others don't
+                    self._seen_throttles = current
+                    self._clean_streak = 0
+                    self.limit = max(self.minimum, self.limit // 2)
+                elif current > before:
+                    # Overlapped a throttle someone already acted on: neither clean nor a new signal
+                    pass
+                else:
+                    self._clean_streak += 1
+                    if self._clean_streak >= self.increase_every and self.limit < self.maximum:
+                        self._clean_streak = 0
+                        self.limit += 1
+                self._cond.notify_all()
+
+
+def parse_retry_after(headers):
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if headers is None:
+        return None
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if value:
+        value = value.strip()
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return parse_duration(headers.get("x-ratelimit-reset-requests"))
+
+
+def parse_duration(value):
+    """Parses OpenAI-style reset durations ('1s', '6m0s', '20ms') into seconds."""
+    if not value:
+        return None
+    total = 0.0
+    matched = False
+    for amount, unit in re.findall(r"([\d.]+)(ms|h|m|s)", value):
+        matched = True
+        amount = float(amount)
+        total += {"ms": amount / 1000, "s": amount, "m": amount * 60, "h": amount * 3600}[unit]
+    return total if matched else None
+
+
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+def get_scheduler():
+    """Process-wide scheduler shared by the HTTP transport and ingest workers."""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RateLimitScheduler()
+        return _default_scheduler
@@ -0,0 +1,137 @@
+import os
+import zlib
+import sqlite3
+import threading
+import time
+
+DEFAULT_STORE_PATH = os.environ.get("RESUME_STORE_PATH", "resume_store.db")
+COMPRESSION_LEVEL = 6
+
+
+class ResumeStore:
+    """
+    Local copy of resume bodies, keyed by Notion page id (SQLite, zlib-compressed text).
+    Filled by main_ingest with the body text, page URL and last_edited_time it just read,
+    so the app can show RAG context / Notion links without a live Notion call per card.
+    """
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS resumes ("
+            " page_id TEXT PRIMARY KEY,"
+            " body BLOB,"
+            " url TEXT,"
+            " last_edited_time TEXT,"
+            " stored_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def normalize_id(page_id):
+        """Notion ids appear both dashed and compact; store them compact."""
+        return (page_id or "").replace("-", "")
+
+    def get(self, page_id, last_edited_time=None):
+        """
+        Returns {"text", "url", "last_edited_time"} or None.
+        If last_edited_time is given, an entry stored for a different edit counts as a miss.
+        """
+        return self.get_many([page_id], last_edited_time={page_id: last_edited_time}).get(page_id)
+
+    def get_many(self, page_ids, last_edited_time=None):
+        """page_id -> entry for the ids found (and fresh, if last_edited_time maps id -> timestamp)."""
+        keys = {self.normalize_id(pid): pid for pid in page_ids if pid}
+        rows = []
+        with self._lock:
+            # SQLite limits bound parameters per statement; query in chunks
+            key_list = list(keys)
+            for start in range(0, len(key_list), 500):
+                chunk = key_list[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows.extend(self._conn.execute(
+                    f"SELECT page_id, body, url, last_edited_time FROM resumes WHERE page_id IN ({placeholders})",
+                    chunk
+                ).fetchall())
+
+        found = {}
+        for key, body, url, edited in rows:
+            pid = keys[key]
+            expected = (last_edited_time or {}).get(pid)
+            if expected and edited != expected:
+                continue
+            found[pid] = {
+                "text": zlib.decompress(body).decode("utf-8") if body is not None else None,
+                "url": url,
+                "last_edited_time": edited,
+            }
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get_text(self, page_id):
+        entry = self.get(page_id)
+        return entry["text"] if entry else None
+
+    def get_url(self, page_id):
+        entry = self.get(page_id)
+        return entry["url"] if entry else None
+
+    def put(self, page_id, text=None, url=None, last_edited_time=None):
+        """Upserts one page. Fields passed as None keep their stored value."""
+        body = zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL) if text is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO resumes (page_id, body, url, last_edited_time, stored_at) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(page_id) DO UPDATE SET"
+                "  body = COALESCE(excluded.body, body),"
+                "  url = COALESCE(excluded.url, url),"
+                "  last_edited_time = COALESCE(excluded.last_edited_time, last_edited_time),"
+                "  stored_at = excluded.stored_at",
+                (self.normalize_id(page_id), body, url, last_edited_time, time.time())
+            )
+            self._conn.commit()
+
+    def touch(self, page_id, last_edited_time):
+        """Our own property update bumped last_edited_time; the body is unchanged."""
+        with self._lock:
+            self._conn.execute("UPDATE resumes SET last_edited_time = ? WHERE page_id = ?",
+                               (last_edited_time, self.normalize_id(page_id)))
+            self._conn.commit()
+
+    def remove_missing(self, live_ids):
+        """Drops pages that no longer exist in Notion. Returns the number removed."""
+        live = {self.normalize_id(pid) for pid in live_ids}
+        with self._lock:
+            stored = [row[0] for row in self._conn.execute("SELECT page_id FROM resumes").fetchall()]
+            gone = [pid for pid in stored if pid not in live]
+            self._conn.executemany("DELETE FROM resumes WHERE page_id = ?", [(pid,) for pid in gone])
+            self._conn.commit()
+        return len(gone)
+
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+        return {"entries": size, "hits": self.hits, "misses": self.misses}
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+def get_default_store():
+    """Shared process-wide store. None if unavailable (callers fall back to Notion)."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            try:
+                _default_store = ResumeStore()
+            except Exception as e:
+                print(f"[ResumeStore] Disabled: {e}")
+                _default_store = False
+        return _default_store or None
@@ -9,11 +9,9 @@ def main():
     
     # 1. Fetch All Candidates (Names and IDs)
     print("Fetching all candidates to check for duplicates...")
-    candidates = db.fetch_candidates(limit=None)
-    
-    # 2. Group by Name
+    # 2. Group by Name (grouped as pages stream in)
     name_map = collections.defaultdict(list)
-    for c in candidates:
+    for c in db.iter_candidates():
         name = c.get('name') or c.get('이름') or c.get('title')
         if name:
             name_map[name].append(c)
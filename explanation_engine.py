@@ -1,18 +1,25 @@
 
+from candidate_text import CandidateText
+
+
 def get_matched_items(required_list, resume_text):
     if not required_list:
         return []
-    resume_lower = str(resume_text).lower()
-    return [req for req in required_list if req.lower() in resume_lower]
+    text = CandidateText.of(resume_text)
+    return [req for req in required_list if text.contains(req)]
 
-def generate_explanation(jd_analysis, resume_metadata, rpl_score):
+def generate_explanation(jd_analysis, resume_metadata, rpl_score, hits=None):
     """
     Generates a human-readable explanation for why this candidate was recommended.
+    hits: KeywordHits shared with calculate_rpl (avoids re-scanning the resume).
     """
-    resume_str = str(resume_metadata)
-    
-    matched_core = get_matched_items(jd_analysis.get("core_signals", []), resume_str)
-    matched_support = get_matched_items(jd_analysis.get("supporting_signals", []), resume_str)
+    if hits is not None:
+        matched_core = hits.matched("explain_core")
+        matched_support = hits.matched("explain_support")
+    else:
+        text = CandidateText.of(resume_metadata)
+        matched_core = get_matched_items(jd_analysis.get("core_signals", []), text)
+        matched_support = get_matched_items(jd_analysis.get("supporting_signals", []), text)
     checkpoints = jd_analysis.get("interview_checkpoints", [])
     
     # Determine Status
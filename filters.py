@@ -1,5 +1,6 @@
 from typing import List, Dict, Any, Optional, Tuple
 from matrices import ScoreMatrix, Competency
+from candidate_text import CandidateText, candidate_text
 
 class BaseFilter:
     def apply(self, candidates: List[Dict[str, Any]], context: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[str]]:
@@ -66,7 +67,7 @@ class HardFilter(BaseFilter):
                          logs.append(f"PENALTY(Role): {cand.get('id')} -5 ({cand_role} != {role_family})")
 
                 # 3. Explicit Negative Signals
-                if self._check_negative_signals(cand['data'], neg_signals):
+                if self._check_negative_signals(candidate_text(cand), neg_signals):
                     penalty += 15 # Severe penalty
                     reasons.append("Negative Signal")
                     logs.append(f"PENALTY(Negative): {cand.get('id')} -15 (Triggered Signal)")
@@ -117,8 +118,8 @@ class HardFilter(BaseFilter):
         """
         if not signals: return False
         
-        summary = cand_data.get('summary', '').lower()
-        title = cand_data.get('title', '').lower()
+        text = CandidateText.of(cand_data)
+        title = text.field('title')
         
         for sig in signals:
             sig_lower = sig.lower()
@@ -167,13 +168,14 @@ class MatrixFilter(BaseFilter):
         for cand in candidates:
             score = 0
             reasons = []
+            text = candidate_text(cand)  # Normalized once, shared by all competencies
             
             for comp in self.matrix.competencies:
                 matched = False
                 
                 # Check custom logic first
                 if comp.custom_logic:
-                    if comp.custom_logic(cand['data']):
+                    if comp.custom_logic(text):
                         matched = True
                 
                 if matched:
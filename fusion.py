@@ -0,0 +1,139 @@
+"""
+Ensemble result fusion.
+Merges the match lists of several vector queries in one pass (dict-indexed),
+optionally collapsing summary/_exp_N vectors to one entry per candidate.
+
+Ensemble strategies (fuse_results):
+- "max": best cosine score across queries (previous deduplicate_results behavior)
+- "rrf": reciprocal-rank fusion, sum(w / (k + rank)), normalized to 0..1
+- "weighted": weighted mean of each query's best score (missing query = 0)
+
+Single-query aggregation (aggregate_candidates): "max", "softmax" (smooth max), "sum" (top-n).
+"""
+import math
+
+FUSION_STRATEGIES = ("max", "rrf", "weighted")
+RRF_K = 60
+
+AGGREGATIONS = ("max", "softmax", "sum")
+SOFTMAX_TEMPERATURE = 0.05
+
+
+def summary_vector_id(vid):
+    """'{compact_id}_exp_{i}' -> '{compact_id}' (the candidate's summary vector id)."""
+    head, sep, tail = vid.rpartition("_exp_")
+    return head if sep and tail.isdigit() else vid
+
+
+def candidate_key(match):
+    """Candidate a vector belongs to: metadata candidate_id, else the id without its _exp_N suffix."""
+    meta = match.get("metadata") or {}
+    if meta.get("candidate_id"):
+        return meta["candidate_id"]
+    return summary_vector_id(match["id"])
+
+
+def fuse_results(results_list, strategy="max", weights=None, rrf_k=RRF_K, collapse=True):
+    """
+    results_list: list of match lists (one per query, each sorted by score desc).
+    weights: optional per-query weights aligned with results_list.
+    Returns fused matches sorted by fused 'score'. Each keeps the summary vector's
+    id/metadata when available, plus 'vector_score' (max raw cosine) and 'hits' (#queries).
+    """
+    if strategy not in FUSION_STRATEGIES:
+        raise ValueError(f"Unknown fusion strategy: {strategy}")
+    if weights is None:
+        weights = [1.0] * len(results_list)
+
+    entries = {}
+    for q, matches in enumerate(results_list):
+        for rank, match in enumerate(matches or []):
+            key = candidate_key(match) if collapse else match["id"]
+            score = match.get("score", 0.0)
+            entry = entries.get(key)
+            if entry is None:
+                entry = {"best": match, "summary": None, "max": score, "ranks": {}, "scores": {}, "vectors": 0}
+                entries[key] = entry
+            elif score > entry["max"]:
+                entry["best"] = match
+                entry["max"] = score
+            entry["vectors"] += 1
+            if (match.get("metadata") or {}).get("type") == "summary":
+                entry["summary"] = match
+            # A candidate can appear several times per query (summary + experiences): keep its best
+            if q not in entry["ranks"]:
+                entry["ranks"][q] = rank
+            if score > entry["scores"].get(q, float("-inf")):
+                entry["scores"][q] = score
+
+    total_weight = sum(weights) or 1.0
+    rrf_max = total_weight / (rrf_k + 1)
+
+    fused = []
+    for entry in entries.values():
+        if strategy == "max":
+            score = entry["max"]
+        elif strategy == "rrf":
+            score = sum(weights[q] / (rrf_k + rank + 1) for q, rank in entry["ranks"].items()) / rrf_max
+        else:
+            score = sum(weights[q] * s for q, s in entry["scores"].items()) / total_weight
+
+        base = entry["summary"] or entry["best"]
+        result = dict(base)
+        result["score"] = score
+        result["vector_score"] = entry["max"]
+        result["hits"] = len(entry["ranks"])
+        result["matched_vectors"] = entry["vectors"]
+        fused.append(result)
+
+    fused.sort(key=lambda m: (m["score"], m["vector_score"]), reverse=True)
+    return fused
+
+
+def aggregate_candidates(matches, method="max", top_n=3, temperature=SOFTMAX_TEMPERATURE):
+    """
+    Groups the matches of one query by candidate (summary + experience vectors).
+    Returns match-shaped dicts sorted by aggregated 'score':
+    id = summary vector id, metadata = summary metadata if it was retrieved
+    ('has_summary' False otherwise; caller may fetch it), 'vector_score' = best cosine.
+    "sum" adds the top_n scores and can exceed 1.0.
+    """
+    if method not in AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation: {method}")
+
+    groups = {}
+    for match in matches:
+        key = candidate_key(match)
+        group = groups.get(key)
+        if group is None:
+            group = {"id": summary_vector_id(match["id"]), "best": match, "summary": None, "scores": []}
+            groups[key] = group
+        elif match.get("score", 0.0) > group["best"].get("score", 0.0):
+            group["best"] = match
+        group["scores"].append(match.get("score", 0.0))
+        if (match.get("metadata") or {}).get("type") == "summary":
+            group["summary"] = match
+
+    results = []
+    for group in groups.values():
+        scores = sorted(group["scores"], reverse=True)[:top_n]
+        if method == "max":
+            score = scores[0]
+        elif method == "softmax":
+            # Smooth max: ~max for one strong hit, small bonus for several strong ones
+            score = min(1.0, scores[0] + temperature * math.log(sum(math.exp((s - scores[0]) / temperature) for s in scores)))
+        else:
+            score = sum(scores)
+
+        base = group["summary"] or group["best"]
+        results.append({
+            "id": group["summary"]["id"] if group["summary"] else group["id"],
+            "score": score,
+            "vector_score": scores[0],
+            "metadata": base.get("metadata") or {},
+            "has_summary": group["summary"] is not None,
+            "matched_vectors": len(group["scores"]),
+        })
+
+    results.sort(key=lambda m: (m["score"], m["vector_score"]), reverse=True)
+    return results
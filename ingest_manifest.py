@@ -0,0 +1,138 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime, timezone, timedelta
+
+MANIFEST_PATH = "ingest_manifest.json"
+
+
+def vector_base_id(cand_id):
+    """Pinecone id of a candidate's summary vector (experience vectors add _exp_N): the Notion page id."""
+    return (cand_id or "").replace("-", "")
+
+
+def legacy_vector_id(name):
+    """Summary vector id written by ingests before page-id keys: a hash of the candidate name."""
+    return hashlib.md5((name or "Unknown").encode()).hexdigest()[:10]
+
+
+def content_hash(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part or "").encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+class IngestManifest:
+    """
+    Local record of what has been ingested:
+    candidate id -> last_edited_time, content hash, vector ids, model version.
+    Lets main_ingest skip unchanged pages and clean up vectors of removed candidates.
+    """
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self.entries = {}
+        self.last_run = None
+        self._lock = threading.Lock()
+        self._dirty = 0
+        # vector id -> number of candidates listing it. Older ingests derived ids from the
+        # candidate name, so same-name candidates can share ids; those are never deleted
+        # while another candidate still owns them.
+        self._owners = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.entries = data.get("candidates", {})
+                self.last_run = data.get("last_run")
+            except Exception as e:
+                print(f"[Manifest] Could not read {path} ({e}). Starting fresh.")
+        for entry in self.entries.values():
+            self._own(entry.get("vector_ids", []), 1)
+
+    def _own(self, vector_ids, delta):
+        """Adjusts ownership counts (caller holds the lock, except during __init__)."""
+        for vid in set(vector_ids):
+            count = self._owners.get(vid, 0) + delta
+            if count > 0:
+                self._owners[vid] = count
+            else:
+                self._owners.pop(vid, None)
+
+    def get(self, cand_id):
+        with self._lock:
+            return self.entries.get(cand_id)
+
+    def is_unchanged(self, cand_id, last_edited_time, model_version):
+        """True if the page timestamp and model version match the last ingest."""
+        entry = self.get(cand_id)
+        return bool(entry and entry.get("last_edited_time") == last_edited_time
+                    and entry.get("model_version") == model_version)
+
+    def has_same_content(self, cand_id, body_hash, model_version):
+        entry = self.get(cand_id)
+        return bool(entry and entry.get("content_hash") == body_hash
+                    and entry.get("model_version") == model_version)
+
+    def touch(self, cand_id, last_edited_time):
+        """Page was edited but its content is identical; just advance the timestamp."""
+        with self._lock:
+            if cand_id in self.entries:
+                self.entries[cand_id]["last_edited_time"] = last_edited_time
+                self._dirty += 1
+
+    def record(self, cand_id, last_edited_time, body_hash, vector_ids, model_version):
+        """Stores the new state and returns vector ids from the previous ingest that are now stale."""
+        with self._lock:
+            old = self.entries.get(cand_id) or {}
+            self._own(old.get("vector_ids", []), -1)
+            self._own(vector_ids, 1)
+            self.entries[cand_id] = {
+                "last_edited_time": last_edited_time,
+                "content_hash": body_hash,
+                "vector_ids": list(vector_ids),
+                "model_version": model_version,
+            }
+            self._dirty += 1
+            flush = self._dirty >= 50
+            stale = [vid for vid in old.get("vector_ids", []) if vid not in self._owners]
+        if flush:
+            self.save()
+        return stale
+
+    def remove_missing(self, live_ids):
+        """Drops candidates not in `live_ids`; returns their vector ids no live candidate still owns."""
+        live_ids = set(live_ids)
+        removed_vectors = []
+        with self._lock:
+            for cand_id in [c for c in self.entries if c not in live_ids]:
+                vector_ids = self.entries.pop(cand_id).get("vector_ids", [])
+                self._own(vector_ids, -1)
+                removed_vectors.extend(vector_ids)
+                self._dirty += 1
+            return [vid for vid in dict.fromkeys(removed_vectors) if vid not in self._owners]
+
+    def changed_since_filter(self, margin_minutes=5):
+        """Notion query filter for pages edited since the last run (None on first run)."""
+        if not self.last_run:
+            return None
+        since = datetime.fromisoformat(self.last_run) - timedelta(minutes=margin_minutes)
+        return {
+            "timestamp": "last_edited_time",
+            "last_edited_time": {"on_or_after": since.isoformat()}
+        }
+
+    def mark_run(self, started_at):
+        with self._lock:
+            self.last_run = started_at.astimezone(timezone.utc).isoformat()
+
+    def save(self):
+        with self._lock:
+            data = {"last_run": self.last_run, "candidates": self.entries}
+            self._dirty = 0
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
@@ -0,0 +1,161 @@
+import time
+import queue
+import threading
+import traceback
+
+_DONE = object()  # End-of-stream marker passed between stages
+
+
+class Stage:
+    """
+    One step of a streaming pipeline.
+    fn(item) -> output item (or None to drop it).
+    With batch_size > 1, fn(list_of_items) -> list of output items. If a batch call
+    raises, its items are retried one by one, so only the failing items are lost
+    (and counted in metrics["errors"]).
+    """
+    def __init__(self, name, fn, workers=1, batch_size=1, batch_timeout=1.0,
+                 queue_size=None, limiter=None):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.queue_size = queue_size or max(4, workers * 2 * batch_size)
+        self.limiter = limiter  # Optional AdaptiveConcurrency gate
+        self.metrics = {"in": 0, "out": 0, "errors": 0, "busy_sec": 0.0}
+        self._metrics_lock = threading.Lock()
+
+    def _record(self, n_in, n_out, busy, errors=0):
+        with self._metrics_lock:
+            self.metrics["in"] += n_in
+            self.metrics["out"] += n_out
+            self.metrics["busy_sec"] += busy
+            self.metrics["errors"] += errors
+
+    def _call(self, payload):
+        if self.limiter:
+            with self.limiter.slot():
+                return self.fn(payload)
+        return self.fn(payload)
+
+
+class StreamingPipeline:
+    """
+    Runs items through a chain of Stages connected by bounded queues.
+    Each stage has its own worker threads and batching; a full queue blocks the
+    upstream stage (backpressure), so memory stays bounded regardless of input size.
+    """
+    def __init__(self, stages):
+        self.stages = stages
+        self.queues = [queue.Queue(maxsize=s.queue_size) for s in stages]
+        self.started_at = None
+        self.finished_at = None
+
+    def run(self, source):
+        self.started_at = time.time()
+        threads = []
+        for i, stage in enumerate(self.stages):
+            in_q = self.queues[i]
+            out_q = self.queues[i + 1] if i + 1 < len(self.stages) else None
+            remaining = {"workers": stage.workers}
+            lock = threading.Lock()
+            for w in range(stage.workers):
+                t = threading.Thread(
+                    target=self._worker, args=(stage, in_q, out_q, remaining, lock),
+                    name=f"{stage.name}-{w}", daemon=True
+                )
+                t.start()
+                threads.append(t)
+
+        first_q = self.queues[0]
+        for item in source:
+            first_q.put(item)  # Blocks when the first stage is saturated
+        for _ in range(self.stages[0].workers):
+            first_q.put(_DONE)
+
+        for t in threads:
+            t.join()
+        self.finished_at = time.time()
+        return self.report()
+
+    def _worker(self, stage, in_q, out_q, remaining, lock):
+        done = False
+        while not done:
+            item = in_q.get()
+            if item is _DONE:
+                break
+            if stage.batch_size > 1:
+                batch = [item]
+                deadline = time.monotonic() + stage.batch_timeout
+                while len(batch) < stage.batch_size:
+                    try:
+                        nxt = in_q.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if nxt is _DONE:
+                        done = True
+                        break
+                    batch.append(nxt)
+                self._process(stage, batch, out_q, len(batch))
+            else:
+                self._process(stage, item, out_q, 1)
+
+        # Last worker of this stage closes the downstream queue
+        with lock:
+            remaining["workers"] -= 1
+            last = remaining["workers"] == 0
+        if last and out_q is not None:
+            for _ in range(self._next_workers(out_q)):
+                out_q.put(_DONE)
+
+    def _next_workers(self, out_q):
+        return self.stages[self.queues.index(out_q)].workers
+
+    def _process(self, stage, payload, out_q, n_in):
+        t0 = time.time()
+        batch_failed = False
+        try:
+            result = stage._call(payload)
+        except Exception as e:
+            if stage.batch_size > 1 and n_in > 1:
+                print(f"  [!] Stage '{stage.name}' batch of {n_in} failed ({e}); retrying items individually")
+                batch_failed = True
+            else:
+                stage._record(n_in, 0, time.time() - t0, errors=n_in)
+                print(f"  [!] Stage '{stage.name}' failed: {e}")
+                traceback.print_exc()
+                return
+        if batch_failed:
+            # Isolate the failure: one bad item (or a transient error) must not drop the whole batch
+            stage._record(0, 0, time.time() - t0)
+            for item in payload:
+                self._process(stage, [item], out_q, 1)
+            return
+
+        outputs = result if stage.batch_size > 1 else [result]
+        outputs = [o for o in (outputs or []) if o is not None]
+        stage._record(n_in, len(outputs), time.time() - t0)
+        if out_q is not None:
+            for o in outputs:
+                out_q.put(o)
+
+    def report(self):
+        """Per-stage throughput metrics."""
+        elapsed = ((self.finished_at or time.time()) - (self.started_at or time.time())) or 1e-9
+        rows = []
+        for stage in self.stages:
+            m = dict(stage.metrics)
+            m["stage"] = stage.name
+            m["items_per_sec"] = round(m["out"] / elapsed, 2)
+            m["busy_sec"] = round(m["busy_sec"], 1)
+            rows.append(m)
+        return {"elapsed_sec": round(elapsed, 1), "stages": rows}
+
+    @staticmethod
+    def print_report(report):
+        print(f"\n[Pipeline] Elapsed: {report['elapsed_sec']}s")
+        print(f"{'STAGE':<10} | {'IN':>6} | {'OUT':>6} | {'ERR':>4} | {'BUSY(s)':>8} | {'OUT/s':>6}")
+        print("-" * 56)
+        for m in report["stages"]:
+            print(f"{m['stage']:<10} | {m['in']:>6} | {m['out']:>6} | {m['errors']:>4} | {m['busy_sec']:>8} | {m['items_per_sec']:>6}")
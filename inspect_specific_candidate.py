@@ -12,15 +12,10 @@ def inspect_candidate(name_query):
         db = HeadhunterDB()
         token = db.secrets["NOTION_API_KEY"]
         
-        # Manually find DB ID (bypass helper issues)
-        # We know the DB ID is likely the one in secrets.json or we can search
-        db_id = db.client.search_db_by_name("Vector DB")
+        # secrets.json > cached lookup (notion_registry.json) > search ("Vector DB", "DB")
+        db_id = db.registry.resolve("candidates")
         if not db_id:
-             db_id = db.client.search_db_by_name("DB")
-        
-        if not db_id:
-            print("DB ID not found via search. Using secrets fallback if avail.")
-            db_id = db.secrets.get("NOTION_DATABASE_ID")
+            print("DB ID not found.")
         
         print(f"Target DB ID: {db_id}")
 
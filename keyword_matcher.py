@@ -0,0 +1,48 @@
+from candidate_text import CandidateText
+
+
+class KeywordHits:
+    """Which keywords of a KeywordMatcher occur in one resume text (reusable across scorers)."""
+    def __init__(self, matcher, found):
+        self.matcher = matcher
+        self.found = found  # Indexes into matcher.patterns
+
+    def matched(self, group):
+        """Original keywords of `group` found in the text, in group order."""
+        return [kw for kw, idx in self.matcher.groups.get(group, []) if idx in self.found]
+
+    def count(self, group):
+        return sum(1 for _, idx in self.matcher.groups.get(group, []) if idx in self.found)
+
+    def any(self, group):
+        return any(idx in self.found for _, idx in self.matcher.groups.get(group, []))
+
+
+class KeywordMatcher:
+    """
+    Multi-group keyword matcher, compiled once per JD.
+    Keywords are lowercased and deduplicated across groups, so scanning a resume
+    checks each distinct keyword once and every consumer (disqualifier filter,
+    RPL scoring, explanation) reads the same KeywordHits.
+    Matching is case-insensitive substring containment (same as `kw.lower() in text.lower()`).
+    """
+    def __init__(self, groups):
+        self.patterns = []
+        self.groups = {}
+        index = {}
+        for name, keywords in groups.items():
+            entries = []
+            for kw in keywords or []:
+                pattern = str(kw).lower()
+                idx = index.get(pattern)
+                if idx is None:
+                    idx = len(self.patterns)
+                    index[pattern] = idx
+                    self.patterns.append(pattern)
+                entries.append((kw, idx))
+            self.groups[name] = entries
+
+    def scan(self, text):
+        """Single pass over the distinct keywords. `text`: CandidateText or any string/dict."""
+        text = CandidateText.of(text).text
+        return KeywordHits(self, {i for i, p in enumerate(self.patterns) if p in text})
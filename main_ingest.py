@@ -1,13 +1,29 @@
 
 import json
 import time
-from connectors.notion_api import HeadhunterDB
-from connectors.notion_api import HeadhunterDB
+import argparse
+from datetime import datetime, timezone
+from connectors.notion_api import HeadhunterDB, NotionQueryError
 from connectors.openai_api import OpenAIClient
-from connectors.pinecone_api import PineconeClient
+from connectors.pinecone_api import PineconeClient, BulkUpserter
+from connectors.resume_store import get_default_store
+from connectors.http_transport import configure_transport
+from connectors.rate_limit import get_scheduler, AdaptiveConcurrency
+from ingest_pipeline import Stage, StreamingPipeline
+from search_cache import bump_index_version
+from ingest_manifest import IngestManifest, content_hash, vector_base_id, legacy_vector_id
 
 from classification_rules import ALLOWED_ROLES, ALLOWED_DOMAINS, get_role_cluster, validate_role, validate_domains
 
+MAX_LLM_WORKERS = 16
+# Bump when parsing/embedding logic changes so the manifest re-ingests everything
+MODEL_VERSION = "text-embedding-3-small@768|parse_and_classify-v1"
+EMBED_WINDOW = 16   # candidates per embeddings request
+UPSERT_BATCH_SIZE = 100
+# Connections per host: every extract worker plus the embed workers can hit OpenAI at once
+TRANSPORT_POOL_SIZE = MAX_LLM_WORKERS + 4
+LEGACY_FETCH_SIZE = 20  # ids per fetch while looking for a candidate's name-hash vectors
+
 def setup_database(notion_db, db_id):
     """Ensures the database has necessary properties."""
     print(f"Verifying Database Schema for {db_id}...")
@@ -16,8 +32,14 @@ def setup_database(notion_db, db_id):
         "Role Cluster": {"select": {}},
         "Domain": {"multi_select": {}}
     }
+    # Schema snapshot from the registry: skip the PATCH when every property already exists
+    schema = notion_db.registry.schema("candidates")
+    if all(schema.get(name, {}).get("type") in spec for name, spec in props.items()):
+        print("  -> Schema Verified (snapshot).")
+        return
     try:
         notion_db.client.update_database(db_id, props)
+        notion_db.registry.schema("candidates", refresh=True)
         print("  -> Schema Verified (AI_Generated, Role Cluster).")
     except Exception as e:
         print(f"  [!] Schema Update Failed: {e}")
@@ -70,8 +92,134 @@ def analyze_candidate_with_llm(openai_client, text_content):
         print(f"  [!] AI Analysis Failed: {e}")
         return {"position": "Unclassified", "domain": [], "skills": []}
 
-def main():
+def build_embedding_texts(job):
+    """Summary text followed by one text per work experience (embedding inputs)."""
+    structured_data = job.get("structured_data") or {}
+    
+    # A. Summary Vector (Base Profile)
+    domain_str = ", ".join(job["domain_list"])
+    summary_text = f"""
+                Name: {job['name']}
+                Role: {job['position']}
+                Cluster: {job['role_cluster']}
+                Domain: {domain_str}
+                Total Exp: {structured_data.get('total_years_experience', 0)} years
+                Summary: {structured_data.get('summary', '')}
+                Skills: {', '.join(job['skills'])}
+                Resume Body: {job['full_text'][:3000]}
+                """
+    
+    texts = [summary_text]
+    for exp in structured_data.get('work_experience') or []:
+        exp_role = exp.get('role') or 'Unknown Role'
+        exp_company = exp.get('company') or 'Unknown Company'
+        texts.append(f"Role: {exp_role}\nCompany: {exp_company}\nDescription: {exp.get('description') or ''}")
+    return texts
+
+def build_vectors(job, embeddings):
+    """Pairs embeddings (aligned with build_embedding_texts) with Pinecone ids and metadata."""
+    cand = job["cand"]
+    cand_id = job["cand_id"]
+    name = job["name"]
+    position = job["position"]
+    role_cluster = job["role_cluster"]
+    structured_data = job.get("structured_data") or {}
+    # Keyed by Notion page id: same-name candidates must not overwrite each other's vectors
+    compact_id = vector_base_id(cand_id)
+    vectors_to_upsert = []
+
+    emb_summary = embeddings[0] if embeddings else None
+    if emb_summary:
+        basics = structured_data.get("basics") or {}
+        
+        meta_summary = {
+            "candidate_id": cand_id, # Link to Notion ID
+            "name": name,
+            "type": "summary",
+            "position": position,
+            "role_cluster": role_cluster,
+            "domain": job["domain_list"],
+            "summary": (structured_data.get("summary") or "")[:1000],
+            # [Phase 2] Rich Metadata for Filtering
+            "total_years": int(basics.get("total_years_experience") or 0),
+            "skills": (structured_data.get("skills") or [])[:50], 
+            "companies": [w.get("company") for w in (structured_data.get("work_experience") or []) if w.get("company")],
+            "degrees": [edu.get("degree") for edu in (structured_data.get("education") or []) if edu.get("degree")],
+            
+            # Legacy fields for backward compatibility with Scorer
+            "skill_score": float(cand.get('skill_score', 0) or 0),
+            "experience_bonus": float(cand.get('experience_bonus', 0) or 0)
+        }
+        vectors_to_upsert.append({
+            "id": compact_id,
+            "values": emb_summary,
+            "metadata": meta_summary
+        })
+    
+    # B. Experience Vectors
+    work_exp = structured_data.get('work_experience') or []
+    for idx_exp, exp in enumerate(work_exp):
+        emb_exp = embeddings[idx_exp + 1] if idx_exp + 1 < len(embeddings) else None
+        if emb_exp:
+            meta_exp = {
+                "candidate_id": cand_id,
+                "name": name,
+                "type": "experience",
+                "position": position, 
+                "role_cluster": role_cluster,
+                "company": exp.get('company') or 'Unknown Company',
+                "exp_role": exp.get('role') or 'Unknown Role',
+                "duration": int(exp.get('duration_years') or 0)
+            }
+            vectors_to_upsert.append({
+                "id": f"{compact_id}_exp_{idx_exp}",
+                "values": emb_exp,
+                "metadata": meta_exp
+            })
+    return vectors_to_upsert
+
+def delete_legacy_vectors(pinecone, cand_id, name):
+    """
+    Removes the vectors older ingests wrote under name-hash ids (legacy_vector_id, _exp_N).
+    Same-name candidates shared those ids, so only vectors whose metadata still points at
+    this candidate are deleted; the others are left for their own candidate's migration.
+    Returns the number deleted, or None if Pinecone could not be read.
+    """
+    base = legacy_vector_id(name)
+    owned = []
+    ids = [base]
+    next_exp = 0
+    while True:
+        ids += [f"{base}_exp_{i}" for i in range(next_exp, next_exp + LEGACY_FETCH_SIZE)]
+        next_exp += LEGACY_FETCH_SIZE
+        res = pinecone.fetch(ids)
+        if res is None:
+            return None
+        found = res.get("vectors") or {}
+        owned.extend(vid for vid, vec in found.items()
+                     if (vec.get("metadata") or {}).get("candidate_id") == cand_id)
+        # _exp_N ids were written contiguously; stop at the first page that runs out
+        if f"{base}_exp_{next_exp - 1}" not in found:
+            break
+        ids = []
+    if owned and pinecone.delete(ids=owned) is None:
+        return None
+    return len(owned)
+
+def main(full_refresh=False, prune=False):
+    """
+    full_refresh: re-process every candidate regardless of the manifest.
+    prune: in incremental mode, also list all candidates to delete vectors of removed ones
+           (always done on full runs).
+    Vectors of older ingests (name-hash ids) are deleted as each candidate is first ingested
+    under page-id keys. Candidates removed from Notion before that are unknown to the manifest:
+    to drop their vectors too, clear the index and run with --full.
+    """
     print("Starting AI Resume Ingestion Pipeline (Hardened Mode)...")
+    run_started = datetime.now(timezone.utc)
+    manifest = IngestManifest()
+    # Local body/URL copy for the app (RAG context, Notion links)
+    resume_store = get_default_store()
     
     # 1. Load Secrets
     try:
@@ -82,6 +230,8 @@ def main():
         return
 
     # 2. Initialize Connectors
+    # Before any client is built: they all share the transport created here
+    configure_transport(pool_size=TRANSPORT_POOL_SIZE)
     notion_db = HeadhunterDB()
     openai = OpenAIClient(secrets["OPENAI_API_KEY"])
     
@@ -95,198 +245,238 @@ def main():
     try:
         # 3. Fetch Candidates
         # Explicitly get DB ID to setup schema
-        db_id = secrets.get("NOTION_DATABASE_ID")
+        db_id = notion_db.registry.resolve("candidates")
         if db_id:
             setup_database(notion_db, db_id)
             
-        # [Incremental Mode] Only fetch candidates not yet AI-generated
-        # To force full re-ingest, set incremental=False
-        incremental = False # [Phase 2] Force Full Re-ingestion to populate Metadata
-        filter_criteria = None
+        # [Incremental Mode] Only fetch pages edited since the last run (local manifest).
+        # Unchanged pages are then skipped by timestamp / body hash before any LLM call.
+        filter_criteria = None if full_refresh else manifest.changed_since_filter()
+        incremental = filter_criteria is not None
         
         if incremental:
-            print("[Mode] Incremental Ingestion: Fetching only unprocessed candidates...")
-            filter_criteria = {
-                "property": "AI_Generated",
-                "checkbox": {
-                    "equals": False
-                }
-            }
+            print(f"[Mode] Incremental Ingestion: Fetching pages edited since {manifest.last_run}...")
         else:
             print("[Mode] Full Ingestion: Fetching ALL candidates...")
 
-        candidates = notion_db.fetch_candidates(limit=None, filter_criteria=filter_criteria)
-        print(f"Fetched {len(candidates)} candidates from Notion.")
-        
+        # Streamed: the pipeline starts on the first result page while later pages download
+        candidate_ids = []
+        listing = {"complete": False, "fetch_failures": 0}
 
-        # --- Parallel Processing Setup ---
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+        def candidate_source():
+            try:
+                for i, c in enumerate(notion_db.iter_candidates(filter_criteria=filter_criteria)):
+                    candidate_ids.append(c.get('id'))
+                    yield (c, i, total)
+                listing["complete"] = bool(db_id)
+            except NotionQueryError as e:
+                # Process what was listed, but neither prune nor advance last_run on a partial listing
+                print(f"[!] Candidate listing incomplete: {e}")
         
-        # Define the worker function
-        def process_candidate(cand_data):
+
+        # --- Streaming Pipeline Setup ---
+        # fetch -> extract (parse + classify) -> embed -> upsert, each stage with its own
+        # workers/batching and bounded queues in between (backpressure).
+        from resume_parser import ResumeParser
+        parser = ResumeParser(openai)
+        total = "?"  # Unknown until the query stream ends
+        scheduler = get_scheduler()
+
+        # Stage 1: Notion body fetch
+        def fetch_stage(cand_data):
             cand, idx, total = cand_data
             cand_id = cand.get('id')
             name = (cand.get('name') or cand.get('이름') or cand.get('title') or "Unknown")
-            summary = cand.get('summary') or ""
             
             # Manual Override Check
             is_ai_generated = cand.get('ai_generated', False)
             current_position = cand.get('포지션')
             if current_position and current_position != "Unclassified" and is_ai_generated is False:
                 print(f"[{idx+1}/{total}] Skipping {name} (Manually Verified)")
-                return
+                return None
             
-            try:
-                # 1. Fetch Body
+            last_edited = cand.get('last_edited_time')
+            if not full_refresh and manifest.is_unchanged(cand_id, last_edited, MODEL_VERSION):
+                return None
+            
+            # Body already stored for this exact edit (e.g. only MODEL_VERSION changed): no Notion call
+            stored = resume_store.get(cand_id, last_edited_time=last_edited) if (resume_store and last_edited and not full_refresh) else None
+            if stored and stored["text"] is not None:
+                full_text = stored["text"]
+            else:
                 full_text = notion_db.fetch_candidate_details(cand_id)
-                combined_text = f"{summary}\n\n{full_text}"
-                
-                # 2. Parse (Structure)
-                # [Phase 2] Use robust ResumeParser
-                try:
-                    # [Fix] Initialize parser locally or use global if available (but global doesn't pickle well)
-                    # For simplicity in ThreadPool, we can re-init or pass it. 
-                    # Better: Init inside worker to avoid pickle issues with SSL usage in OpenAI client.
-                    if 'parser_instance' not in globals():
-                        from connectors.openai_api import OpenAIClient
-                        from resume_parser import ResumeParser
-                        import json
-                        with open("secrets.json", "r") as f:
-                            secrets = json.load(f)
-                        _openai = OpenAIClient(secrets["OPENAI_API_KEY"])
-                        globals()['parser_instance'] = ResumeParser(_openai)
-                    
-                    structured_data = globals()['parser_instance'].parse(combined_text)
-                    # print(f"  -> Extracted {len(structured_data.get('skills', []))} skills")
-                except Exception as e:
-                    print(f"  [!] Parsing Failed for {name}: {e}")
-                    structured_data = {}
+                if full_text is None:
+                    # Nothing stored or recorded, so the next run retries this candidate
+                    print(f"  [!] Body fetch failed for {name}; skipping (will retry next run)")
+                    listing["fetch_failures"] += 1
+                    return None
+                if resume_store:
+                    resume_store.put(cand_id, full_text, url=cand.get('url'), last_edited_time=last_edited)
+            summary = cand.get('summary') or ""
+            body_hash = content_hash(name, summary, full_text)
+            if not full_refresh and manifest.has_same_content(cand_id, body_hash, MODEL_VERSION):
+                manifest.touch(cand_id, last_edited)
+                return None
+            
+            return {
+                "cand": cand,
+                "cand_id": cand_id,
+                "name": name,
+                "idx": idx,
+                "full_text": full_text,
+                "combined_text": f"{summary}\n\n{full_text}",
+                "body_hash": body_hash,
+                "last_edited_time": last_edited
+            }
 
-                # 3. Classify (Legacy/Hybrid)
-                # print(f"[{idx+1}/{total}] Classifying {name}...")
-                ai_result = analyze_candidate_with_llm(openai, combined_text)
-                
-                # Validation
-                raw_position = ai_result.get("position", "Unclassified")
-                position = validate_role(raw_position, fallback="Unclassified")
-                role_cluster = get_role_cluster(position)
-                raw_domains = ai_result.get("domain", [])
-                domain_list = validate_domains(position, raw_domains)
-                skills = ai_result.get("skills", [])
-                
-                # Update Notion
-                props_update = {
-                    "포지션": {"select": {"name": position}},
-                    "Domain": {"multi_select": [{"name": d} for d in domain_list]},
-                    "Role Cluster": {"select": {"name": role_cluster}},
-                    "AI_Generated": {"checkbox": True}
-                }
-                notion_db.update_candidate(cand_id, props_update)
+        # Stage 2: Extract (structured resume + classification in ONE LLM call) + Notion update
+        def extract_stage(job):
+            # [Phase 2] Use robust ResumeParser (combined parse + classify mode)
+            try:
+                structured_data = parser.parse_and_classify(job["combined_text"], ALLOWED_ROLES, ALLOWED_DOMAINS) or {}
+            except Exception as e:
+                print(f"  [!] Parsing Failed for {job['name']}: {e}")
+                structured_data = {}
+            job["structured_data"] = structured_data
 
-                # 4. Upsert Vectors
-                vectors_to_upsert = []
-                import hashlib
-                compact_id = hashlib.md5(name.encode()).hexdigest()[:10]
-                
-                # A. Summary Vector (Base Profile)
-                domain_str = ", ".join(domain_list)
-                summary_text = f"""
-                Name: {name}
-                Role: {position}
-                Cluster: {role_cluster}
-                Domain: {domain_str}
-                Total Exp: {structured_data.get('total_years_experience', 0)} years
-                Summary: {structured_data.get('summary', '')}
-                Skills: {', '.join(skills)}
-                Resume Body: {full_text[:3000]}
-                """
-                
-                if not structured_data:
-                    structured_data = {}
+            ai_result = structured_data.pop("classification", None)
+            if not ai_result or not ai_result.get("position"):
+                # Fallback: dedicated classification call (legacy path)
+                ai_result = analyze_candidate_with_llm(openai, job["combined_text"])
+            
+            # Validation
+            raw_position = ai_result.get("position", "Unclassified")
+            position = validate_role(raw_position, fallback="Unclassified")
+            role_cluster = get_role_cluster(position)
+            raw_domains = ai_result.get("domain", [])
+            domain_list = validate_domains(position, raw_domains)
+            
+            job.update({
+                "position": position,
+                "role_cluster": role_cluster,
+                "domain_list": domain_list,
+                "skills": ai_result.get("skills", [])
+            })
+            
+            # Update Notion
+            props_update = {
+                "포지션": {"select": {"name": position}},
+                "Domain": {"multi_select": [{"name": d} for d in domain_list]},
+                "Role Cluster": {"select": {"name": role_cluster}},
+                "AI_Generated": {"checkbox": True}
+            }
+            updated = notion_db.update_candidate(job["cand_id"], props_update)
+            # Our own update bumps last_edited_time; remember the new value so it isn't seen as a change
+            if updated and updated.get("last_edited_time"):
+                job["last_edited_time"] = updated["last_edited_time"]
+                if resume_store:
+                    resume_store.touch(job["cand_id"], updated["last_edited_time"])
+            return job
 
-                emb_summary = openai.embed_content(summary_text)
-                if emb_summary:
-                    basics = structured_data.get("basics") or {}
-                    
-                    meta_summary = {
-                        "candidate_id": cand_id, # Link to Notion ID
-                        "name": name,
-                        "type": "summary",
-                        "position": position,
-                        "role_cluster": role_cluster,
-                        "domain": domain_list,
-                        "summary": (structured_data.get("summary") or "")[:1000],
-                        # [Phase 2] Rich Metadata for Filtering
-                        "total_years": int(basics.get("total_years_experience") or 0),
-                        "skills": (structured_data.get("skills") or [])[:50], 
-                        "companies": [job.get("company") for job in (structured_data.get("work_experience") or []) if job.get("company")],
-                        "degrees": [edu.get("degree") for edu in (structured_data.get("education") or []) if edu.get("degree")],
-                        
-                        # Legacy fields for backward compatibility with Scorer
-                        "skill_score": float(cand.get('skill_score', 0) or 0),
-                        "experience_bonus": float(cand.get('experience_bonus', 0) or 0)
-                    }
-                    vectors_to_upsert.append({
-                        "id": compact_id,
-                        "values": emb_summary,
-                        "metadata": meta_summary
-                    })
-                
-                # B. Experience Vectors
-                work_exp = structured_data.get('work_experience') or []
-                for idx_exp, exp in enumerate(work_exp):
-                    exp_role = exp.get('role') or 'Unknown Role'
-                    exp_company = exp.get('company') or 'Unknown Company'
-                    
-                    exp_text = f"Role: {exp_role}\nCompany: {exp_company}\nDescription: {exp.get('description') or ''}"
-                    emb_exp = openai.embed_content(exp_text)
-                    
-                    if emb_exp:
-                        meta_exp = {
-                            "candidate_id": cand_id,
-                            "name": name,
-                            "type": "experience",
-                            "position": position, 
-                            "role_cluster": role_cluster,
-                            "company": exp_company,
-                            "exp_role": exp_role,
-                            "duration": int(exp.get('duration_years') or 0)
-                        }
-                        vectors_to_upsert.append({
-                            "id": f"{compact_id}_exp_{idx_exp}",
-                            "values": emb_exp,
-                            "metadata": meta_exp
-                        })
+        # Stage 4: Embeddings for a window of candidates in one batched request
+        def embed_stage(jobs):
+            all_texts = []
+            for job in jobs:
+                job["texts"] = build_embedding_texts(job)
+                all_texts.extend(job["texts"])
+            
+            embeddings = openai.embed_many(all_texts)
+            
+            offset = 0
+            for job in jobs:
+                n = len(job["texts"])
+                job_embeddings = embeddings[offset:offset + n]
+                if any(vec is None for vec in job_embeddings):
+                    # Raise so the pipeline retries per candidate (cached vectors aren't re-sent) and
+                    # counts the failure; a job with missing vectors must not reach the manifest.
+                    raise RuntimeError(f"Embedding failed for {sum(v is None for v in job_embeddings)} text(s) of {job['name']}")
+                job["vectors"] = build_vectors(job, job_embeddings)
+                offset += n
+            return jobs
 
-                # Upsert remaining for this candidate (Inside TRY)
-                if vectors_to_upsert:
-                     pinecone.upsert(vectors_to_upsert)
-                 
-            except Exception as e:
-                print(f"  [!] Error processing {name}: {e}")
-                import traceback
-                traceback.print_exc()
+        # Stage 5: Hand vectors to the bulk upserter (batched across candidates, parallel flush).
+        # The manifest is only updated once all of a candidate's vectors are written.
+        upserter = BulkUpserter(pinecone, max_vectors=UPSERT_BATCH_SIZE)
+        legacy_jobs = []
 
-        # End of process_candidate
+        def on_candidate_upserted(job, success):
+            if not success:
+                print(f"  [!] Upsert failed for {job['name']} (will retry next run)")
+                return
+            vector_ids = [v["id"] for v in job["vectors"]]
+            if manifest.get(job["cand_id"]) is None:
+                # First ingest under page-id keys: vectors may still exist under the old name-hash ids
+                legacy_jobs.append((job["cand_id"], job["name"]))
+            stale_ids = manifest.record(job["cand_id"], job["last_edited_time"], job["body_hash"],
+                                        vector_ids, MODEL_VERSION)
+            if stale_ids:
+                pinecone.delete(ids=stale_ids)
+            print(f"[{job['idx']+1}/{total}] Ingested {job['name']} ({len(vector_ids)} vectors)")
 
-        # Execute Parallel Processing
-        # We need to ensure candidates_data is available. 
-        # In main(), 'candidates' is the list. 
-        # We need to Wrap it with index: list(enumerate(candidates))?
-        # See line 111: cand, idx, total = cand_data
-        
-        candidates_data = [(c, i, len(candidates)) for i, c in enumerate(candidates)]
-        
-        # Use ThreadPoolExecutor for parallel processing
-        # Reduced workers to 2 to avoid OpenAI 429 Rate Limits
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            futures = {executor.submit(process_candidate, c): c for c in candidates_data}
-            
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    print(f"Worker Exception: {e}")
+        def upsert_stage(job):
+            upserter.add(job["vectors"], on_done=lambda success, job=job: on_candidate_upserted(job, success))
+            return job
+
+        llm_limiter = AdaptiveConcurrency(scheduler, ["openai"], initial=4, maximum=MAX_LLM_WORKERS)
+        pipeline = StreamingPipeline([
+            Stage("fetch", fetch_stage, workers=6),  # Notion ~3 rps (shared limiter); extra workers overlap paginated/nested block requests
+            Stage("extract", extract_stage, workers=MAX_LLM_WORKERS, limiter=llm_limiter),
+            Stage("embed", embed_stage, workers=2, batch_size=EMBED_WINDOW),
+            Stage("upsert", upsert_stage, workers=1),
+        ])
+
+        report = pipeline.run(candidate_source())
+        print(f"Fetched {len(candidate_ids)} candidates from Notion.")
+        upsert_stats = upserter.close()
+        StreamingPipeline.print_report(report)
+        print(f"[Upsert] {upsert_stats}")
+
+        # [V4.4] Migration: drop name-hash vectors of candidates now stored under page-id keys
+        if legacy_jobs:
+            removed, failed = 0, 0
+            for cand_id, name in legacy_jobs:
+                n = delete_legacy_vectors(pinecone, cand_id, name)
+                if n is None:
+                    failed += 1
+                else:
+                    removed += n
+            print(f"[Migrate] Removed {removed} legacy vectors for {len(legacy_jobs)} candidates.")
+            if failed:
+                print(f"[!] Legacy cleanup failed for {failed} candidates; "
+                      "run with --full after clearing the index to rebuild it cleanly.")
+
+        # Orphan cleanup: vectors of candidates that no longer exist in Notion.
+        # Only against a listing known to be complete (a failed/empty query must not delete anything).
+        live_ids = None
+        if not incremental:
+            live_ids = candidate_ids if listing["complete"] else None
+        elif prune and listing["complete"]:
+            print("[Prune] Listing all candidate ids...")
+            try:
+                # Ids only: request just the title property to keep pages small
+                live_ids = [c.get('id') for c in notion_db.iter_candidates(filter_properties=["title"])]
+            except NotionQueryError as e:
+                print(f"[!] Prune listing failed: {e}")
+        if live_ids is not None and not live_ids:
+            print("[Prune] Skipped: Notion listed no candidates.")
+            live_ids = None
+        elif live_ids is None and (prune or not incremental):
+            print("[Prune] Skipped: candidate listing was incomplete.")
+        if live_ids is not None:
+            orphan_ids = manifest.remove_missing(live_ids)
+            if resume_store:
+                resume_store.remove_missing(live_ids)
+            if orphan_ids:
+                print(f"[Prune] Deleting {len(orphan_ids)} orphaned vectors...")
+                for start in range(0, len(orphan_ids), 1000):
+                    pinecone.delete(ids=orphan_ids[start:start + 1000])
+
+        # A partial listing or a failed body fetch: keep the old last_run so the next run re-lists those pages
+        if listing["complete"] and not listing["fetch_failures"]:
+            manifest.mark_run(run_started)
+        manifest.save()
+        # Cached app searches were computed against the old index
+        bump_index_version("main_ingest")
             
     except Exception as e:
         import traceback
@@ -294,7 +484,14 @@ def main():
         traceback.print_exc()
         exit(1)
         
+    if openai.cache:
+        print(f"[EmbeddingCache] {openai.cache.stats()}")
+    print(f"[RateLimit] Throttle events: {get_scheduler().throttle_counts}")
     print("\nIngestion Complete!")
 
 if __name__ == "__main__":
-    main()
+    arg_parser = argparse.ArgumentParser(description="Notion -> Pinecone resume ingestion")
+    arg_parser.add_argument("--full", action="store_true", help="Re-ingest every candidate (ignore manifest)")
+    arg_parser.add_argument("--prune", action="store_true", help="Delete vectors of candidates removed from Notion")
+    args = arg_parser.parse_args()
+    main(full_refresh=args.full, prune=args.prune)
@@ -1,6 +1,7 @@
 
 import json
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from connectors.gemini_api import GeminiClient
 from connectors.pinecone_api import PineconeClient
 from connectors.openai_api import OpenAIClient
@@ -9,6 +10,7 @@ from feedback_weight import calculate_feedback_weight
 from jd_confidence import estimate_jd_confidence
 from search_strategy import decide_search_strategy
 from classification_rules import get_role_cluster
+from fusion import fuse_results
 
 # --- SCORING WEIGHTS (Configurable) ---
 # --- SCORING WEIGHTS (Configurable) ---
@@ -19,6 +21,15 @@ WEIGHTS = {
     "QUANT_EXP": 0.10
 }
 
+# --- ENSEMBLE FUSION ---
+FUSION_STRATEGY = "rrf"  # "max" | "rrf" | "weighted" (see fusion.py)
+QUERY_WEIGHTS = {
+    "technical": 1.0,
+    "functional": 1.0,
+    "domain": 0.8,       # Domain queries pull in adjacent roles; trust them a bit less
+    "constructed": 1.0,
+}
+
 def extract_jd_semantics(openai_client, jd_text):
     """
     Extracts structured semantic information from the Job Description
@@ -76,25 +87,7 @@ def calculate_final_score(vector_score, metadata):
 
 def deduplicate_results(results_list):
     """Simple deduplication by ID, keeping the highest score."""
-    seen = {}
-    final_list = []
-    # results_list is a list of lists of matches
-    for batch in results_list:
-        for match in batch:
-            mid = match['id']
-            if mid not in seen:
-                seen[mid] = match
-                final_list.append(match)
-            else:
-                # Specify strategy: keep max score?
-                if match['score'] > seen[mid]['score']:
-                    seen[mid] = match
-                    # Update in final_list (inefficient list scan, but fine for small N)
-                    for i, item in enumerate(final_list):
-                        if item['id'] == mid:
-                            final_list[i] = match
-                            break
-    return final_list
+    return fuse_results(results_list, strategy="max", collapse=False)
 
 def search_candidates(jd_text, limit=5):
     # 1. Load Secrets
@@ -145,44 +138,68 @@ def search_candidates(jd_text, limit=5):
 
     # CLUSTER FILTER (Optional - Strategy Dependent)
     if role_cluster != "Unclassified":
-         # Check if we should apply this hard filter? 
-         # Let's apply it, but allow fallback if 0 results (TODO)
+         # Hard filter, with fallback below if it yields 0 results
          filter_meta['role_cluster'] = {"$eq": role_cluster}
          print(f"  -> Applying Cluster Filter: {role_cluster}")
 
     # 3. Ensemble Search (Multi-Query)
     queries = semantic_data.get('search_queries', [jd_text])
     if isinstance(queries, str): queries = [queries] # handle error case
+    # LLM queries come in order: 1. technical 2. functional 3. domain
+    query_types = ["technical", "functional", "domain"]
+    labeled = [(query_types[i] if i < len(query_types) else "technical", q) for i, q in enumerate(queries)]
     
     # Ensure we use the Semantic Constructed Query as one of them if not present
     constructed_query = f"Role: {semantic_data.get('primary_role')} Skills: {semantic_data.get('must_skills')}"
-    queries.append(constructed_query)
+    labeled.append(("constructed", constructed_query))
     
-    # Deduplicate queries just in case
-    queries = list(set(queries))
+    # Deduplicate queries just in case (keep order so weights stay aligned)
+    unique_labeled = {}
+    for q_type, q in labeled:
+        unique_labeled.setdefault(q, q_type)
+    labeled = [(t, q) for q, t in unique_labeled.items()]
+    queries = [q for _, q in labeled]
     
     # Use Strategy Parameters
     top_k_param = strategy['top_k']
     print(f"  -> Running Ensemble Search (Top-K: {top_k_param}) with {len(queries)} strategies...")
     
-    all_matches = []
-    
-    for q_idx, query_text in enumerate(queries):
-        # Embed
-        q_vec = openai.embed_content(query_text)
-        if not q_vec: continue
-        
-        # Search with Filter
+    # Embed all queries in one request; reused if the cluster filter is relaxed below
+    try:
+        query_vectors = openai.embed_many(queries)
+    except Exception as e:
+        print(f"    [!] Batch embedding failed: {e}")
+        query_vectors = []
+    searches = [(q, v, QUERY_WEIGHTS.get(t, 1.0)) for (t, q), v in zip(labeled, query_vectors) if v]
+
+    def search_one(query_text, q_vec, filter_meta):
         try:
             res = pinecone.query(q_vec, top_k=top_k_param, filter_meta=filter_meta)
             if res and 'matches' in res:
-                all_matches.append(res['matches'])
+                return res['matches']
         except Exception as e:
             print(f"    [!] Search failed for query '{query_text[:20]}...': {e}")
+        return None
+
+    def run_ensemble(filter_meta):
+        # Fan out Pinecone queries concurrently (latency ~ one query instead of the sum)
+        if not searches:
+            return [], []
+        with ThreadPoolExecutor(max_workers=len(searches)) as executor:
+            results = list(executor.map(lambda s: search_one(s[0], s[1], filter_meta), searches))
+        ok = [(r, s[2]) for r, s in zip(results, searches) if r is not None]
+        return [r for r, _ in ok], [w for _, w in ok]
             
-    # Deduplicate Ensemble Results
-    unique_matches = deduplicate_results(all_matches)
-    print(f"  -> Ensemble retrieved {len(unique_matches)} unique candidates.")
+    all_matches, query_weights = run_ensemble(filter_meta)
+    if not any(all_matches) and 'role_cluster' in filter_meta:
+        # Cluster filter was too strict (e.g. mis-classified candidates); relax it
+        print(f"  -> 0 results with Cluster Filter. Retrying without it...")
+        filter_meta = {k: v for k, v in filter_meta.items() if k != 'role_cluster'}
+        all_matches, query_weights = run_ensemble(filter_meta)
+
+    # Fuse Ensemble Results (one entry per candidate, summary + experience vectors collapsed)
+    unique_matches = fuse_results(all_matches, strategy=FUSION_STRATEGY, weights=query_weights)
+    print(f"  -> Ensemble retrieved {len(unique_matches)} unique candidates ({FUSION_STRATEGY} fusion).")
     
     if not unique_matches:
         print("No matches found given the criteria.")
@@ -213,10 +230,11 @@ def search_candidates(jd_text, limit=5):
     # 5. Hybrid Re-ranking
     ranked_candidates = []
     for match in unique_matches:
-        vec_score = match['score'] # Cosine Similarity
+        vec_score = match['vector_score'] # Best Cosine Similarity
         meta = match['metadata']
         
-        hybrid_score = calculate_final_score(vec_score, meta)
+        # Relevance = fused ensemble score (0..1), not just whichever query scored highest
+        hybrid_score = calculate_final_score(match['score'], meta)
         
         # Apply Feedback Adjustment
         # Boost/Penalty: +1.0 weight -> +10 score (approx)
@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 from typing import List, Callable, Dict, Any
+from candidate_text import CandidateText
 
 @dataclass
 class Competency:
@@ -19,8 +20,9 @@ class ScoreMatrix:
 # --- Helper Logic Functions ---
 
 def is_role_match(meta: Dict[str, Any], keywords: List[str]) -> bool:
-    title = meta.get('title', '').lower().replace(" ", "")
-    role_cluster = meta.get('role_cluster', '').lower()
+    text = CandidateText.of(meta)
+    title = text.compact('title')
+    role_cluster = text.field('role_cluster')
     
     for k in keywords:
         k_clean = k.lower().replace(" ", "")
@@ -31,8 +33,9 @@ def is_role_match(meta: Dict[str, Any], keywords: List[str]) -> bool:
 def has_skill_match(meta: Dict[str, Any], keywords: List[str]) -> bool:
     # Check skills list (if available) or raw text in summary/body
     # Assuming meta has 'skills' list or we check 'summary'
-    skills = [s.lower() for s in meta.get('skills', [])]
-    summary = meta.get('summary', '').lower()
+    text = CandidateText.of(meta)
+    skills = text.items('skills')
+    summary = text.field('summary')
     
     for k in keywords:
         k_lower = k.lower()
@@ -45,7 +48,7 @@ def has_skill_match(meta: Dict[str, Any], keywords: List[str]) -> bool:
 def check_tech_collab(meta: Dict[str, Any]) -> bool:
     # Custom logic for PM/PO collaboration with devs
     keywords = ["development", "engineering", "devs", "개발자", "엔지니어", "협업"]
-    summary = meta.get('summary', '').lower()
+    summary = CandidateText.of(meta).field('summary')
     return any(k in summary for k in keywords)
 
 def check_data_driven(meta: Dict[str, Any]) -> bool:
@@ -1,14 +1,21 @@
 import os
-import json
-import time
+import zlib
+import sqlite3
+import hashlib
+import threading
 import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
 from connectors.notion_api import HeadhunterDB
+from ingest_pipeline import Stage, StreamingPipeline
 import PyPDF2
 from docx import Document
 import win32com.client
 import pythoncom
 
 RESUME_DIR = r"C:\Users\cazam\Downloads\02_resume 전처리"
+TEXT_CACHE_PATH = "pdf_text_cache.db"
+EXTRACT_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # PDF parsing is CPU-bound -> processes
+UPLOAD_WORKERS = 3  # Notion ~3 rps; the shared transport limiter paces the requests
 
 def chunk_text(text, limit=1000): # Reduced limit for safety
     """Splits text into chunks of max 1000 characters for Notion blocks."""
@@ -63,26 +70,110 @@ def extract_text(file_path):
         return extract_text_from_doc_using_win32(file_path)
     return ""
 
+def file_hash(filepath):
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+class ExtractedTextCache:
+    """Extracted text by file content hash (SQLite, zlib), so re-runs skip parsing unchanged files."""
+    def __init__(self, path=TEXT_CACHE_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS texts (hash TEXT PRIMARY KEY, body BLOB NOT NULL)")
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM texts WHERE hash = ?", (key,)).fetchone()
+        return zlib.decompress(row[0]).decode("utf-8") if row else None
+
+    def put(self, key, text):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO texts (hash, body) VALUES (?, ?)",
+                               (key, zlib.compress(text.encode("utf-8"))))
+            self._conn.commit()
+
+def extract_for_upload(filepath):
+    """Runs in a worker process. Same formats as before: PDF and DOCX (.doc gets the placeholder)."""
+    lower = filepath.lower()
+    if lower.endswith('.pdf'):
+        return extract_text_from_pdf(filepath)
+    elif lower.endswith('.docx'):
+        return extract_text_from_docx(filepath)
+    return ""
+
+def build_page(filename, content):
+    """Notion properties + children blocks for one resume file."""
+    # Parse Filename and Generate Drive Link
+    name_prop = filename.replace(".pdf", "").replace(".docx", "")
+    drive_link = f"https://drive.google.com/drive/u/0/search?q={urllib.parse.quote(filename)}"
+    
+    # Prepare Notion Blocks
+    children_blocks = []
+    
+    # 1. Add Link to Drive File (Callout Block)
+    children_blocks.append({
+        "object": "block",
+        "type": "callout",
+        "callout": {
+            "rich_text": [
+                {
+                    "type": "text", 
+                    "text": { "content": f"📂 View Original File: {filename}", "link": {"url": drive_link} } 
+                }
+            ],
+            "icon": {"emoji": "📄"}
+        }
+    })
+
+    chunks = chunk_text(content)
+    
+    # Limit to first 50 blocks (~100k chars) to avoid timeouts/limits
+    if len(chunks) > 50:
+         chunks = chunks[:50]
+         chunks.append("... (Truncated)")
+         
+    for chunk in chunks:
+        children_blocks.append({
+            "object": "block",
+            "type": "paragraph",
+            "paragraph": {
+                "rich_text": [{ "type": "text", "text": { "content": chunk } }]
+            }
+        })
+        
+    # Prepare Properties
+    # Note: Adjust property names to match your Notion DB schema!
+    # Guaranteed schema usually has 'Name' (title). 
+    # Optional: 'Position', 'Domain', 'Summary'.
+    properties = {
+        "이름": {
+            "title": [{"text": {"content": name_prop}}]
+        },
+        "Role Cluster": {
+            "select": {"name": "Unclassified"}
+        },
+        "Domain": {
+             "multi_select": [{"name": "Unclassified"}]
+        },
+        "구글드라이브 링크": {
+            "url": drive_link
+        }
+    }
+    return properties, children_blocks
+
 def main():
     print("Initializing Notion Uploader...")
     db = HeadhunterDB()
     client = db.client
     
     # 1. Find Target Database
-    # Priority: secrets.json > Search by Name
+    # Resolved by the shared DatabaseRegistry: secrets.json, else notion_registry.json, else one search
     target_db_name = "Vector DB"
-    db_id = None
-    
-    try:
-        with open("secrets.json", "r") as f:
-            secrets = json.load(f)
-            db_id = secrets.get("NOTION_DATABASE_ID")
-    except Exception:
-        pass
-        
-    if not db_id:
-        print("No ID in secrets. Searching by name...")
-        db_id = client.search_db_by_name(target_db_name)
+    db_id = db.registry.resolve("candidates")
     
     if not db_id:
         print(f"CRITICAL: Database '{target_db_name}' not found!")
@@ -96,13 +187,10 @@ def main():
     print("Checking for existing pages to avoid duplicates...")
     existing_pages = set()
     
-    # Use improved query_database which handles pagination
-    res = client.query_database(db_id, limit=None)
-    all_results = res.get('results', [])
-    
-    print(f"  Fetched {len(all_results)} existing pages from Notion.")
-        
-    for p in all_results:
+    # Stream pages (title property only: "title" is its fixed property id) instead of listing everything
+    page_count = 0
+    for p in client.iter_database(db_id, filter_properties=["title"]):
+        page_count += 1
         props = p.get('properties', {})
         # Check '이름' or 'Name' or 'title'
         for key, val in props.items():
@@ -110,6 +198,7 @@ def main():
                 if val['title']:
                     existing_pages.add(val['title'][0]['plain_text'])
     
+    print(f"  Fetched {page_count} existing pages from Notion.")
     print(f"Found {len(existing_pages)} unique existing titles.")
 
     # 3. Scan Files (Recursive)
@@ -122,104 +211,66 @@ def main():
 
     print(f"Found {len(files)} resume files.")
     
-    success_count = 0
-    fail_count = 0
-    skipped_count = 0
-    
-    for i, filepath in enumerate(files):
+    # 4. Extract (process pool, cached by content hash) -> Upload (rate-limited), overlapped
+    counts = {"success": 0, "fail": 0, "skipped": 0, "cached": 0}
+    counts_lock = threading.Lock()
+    text_cache = ExtractedTextCache()
+
+    def count(key):
+        with counts_lock:
+            counts[key] += 1
+
+    def source():
+        for i, filepath in enumerate(files):
+            # Check Duplicate
+            name_check = os.path.splitext(os.path.basename(filepath))[0]
+            if name_check in existing_pages:
+                count("skipped")
+                continue
+            yield (i, filepath)
+
+    def extract_stage(item):
+        i, filepath = item
         filename = os.path.basename(filepath)
-        
-        # Check Duplicate
-        name_check = os.path.splitext(filename)[0]
-        if name_check in existing_pages:
-             # print(f"[{i+1}/{len(files)}] Skipping (Already Exists): {filename}")
-             skipped_count += 1
-             continue
         print(f"[{i+1}/{len(files)}] Processing: {filename}...")
-        
-        # Extract Text
-        content = ""
-        if filename.lower().endswith('.pdf'):
-            content = extract_text_from_pdf(filepath)
-        elif filename.lower().endswith('.docx'):
-            content = extract_text_from_docx(filepath)
-            
+        key = file_hash(filepath)
+        content = text_cache.get(key)
+        if content is None:
+            content = pool.submit(extract_for_upload, filepath).result()
+            if content.strip():
+                text_cache.put(key, content)
+        else:
+            count("cached")
+
         if not content.strip():
-            print(f"  [!] No text extracted. Uploading with placeholder.")
+            print(f"  [!] No text extracted ({filename}). Uploading with placeholder.")
             content = "Original File Content Not Extracted. Please check the attached link."
-            # fail_count += 1
-            # continue
-            
-        # Parse Filename and Generate Drive Link
-        name_prop = filename.replace(".pdf", "").replace(".docx", "")
-        drive_link = f"https://drive.google.com/drive/u/0/search?q={urllib.parse.quote(filename)}"
-        
-        # Prepare Notion Blocks
-        children_blocks = []
-        
-        # 1. Add Link to Drive File (Callout Block)
-        children_blocks.append({
-            "object": "block",
-            "type": "callout",
-            "callout": {
-                "rich_text": [
-                    {
-                        "type": "text", 
-                        "text": { "content": f"📂 View Original File: {filename}", "link": {"url": drive_link} } 
-                    }
-                ],
-                "icon": {"emoji": "📄"}
-            }
-        })
-
-        chunks = chunk_text(content)
-        
-        # Limit to first 50 blocks (~100k chars) to avoid timeouts/limits
-        if len(chunks) > 50:
-             chunks = chunks[:50]
-             chunks.append("... (Truncated)")
-             
-        for chunk in chunks:
-            children_blocks.append({
-                "object": "block",
-                "type": "paragraph",
-                "paragraph": {
-                    "rich_text": [{ "type": "text", "text": { "content": chunk } }]
-                }
-            })
-            
-        # Prepare Properties
-        # Note: Adjust property names to match your Notion DB schema!
-        # Guaranteed schema usually has 'Name' (title). 
-        # Optional: 'Position', 'Domain', 'Summary'.
-        properties = {
-            "이름": {
-                "title": [{"text": {"content": name_prop}}]
-            },
-            "Role Cluster": {
-                "select": {"name": "Unclassified"}
-            },
-            "Domain": {
-                 "multi_select": [{"name": "Unclassified"}]
-            },
-            "구글드라이브 링크": {
-                "url": drive_link
-            }
-        }
+        return filename, content
 
+    def upload_stage(job):
+        filename, content = job
+        properties, children_blocks = build_page(filename, content)
         try:
             res = client.create_page(db_id, properties, children_blocks)
             if res:
-                print("  -> Upload Success!")
-                success_count += 1
+                print(f"  -> Upload Success: {filename}")
+                count("success")
             else:
-                print("  -> Upload Failed (API Error).")
-                fail_count += 1
+                print(f"  -> Upload Failed (API Error): {filename}")
+                count("fail")
         except Exception as e:
-            print(f"  -> Upload Failed: {e}")
-            fail_count += 1
-            
-        time.sleep(0.5) # Rate limit protection
+            print(f"  -> Upload Failed: {filename}: {e}")
+            count("fail")
+
+    with ProcessPoolExecutor(max_workers=EXTRACT_WORKERS) as pool:
+        pipeline = StreamingPipeline([
+            Stage("extract", extract_stage, workers=EXTRACT_WORKERS),
+            Stage("upload", upload_stage, workers=UPLOAD_WORKERS),
+        ])
+        report = pipeline.run(source())
+    StreamingPipeline.print_report(report)
+    success_count, fail_count, skipped_count = counts["success"], counts["fail"], counts["skipped"]
+    print(f"Text cache hits: {counts['cached']}")
 
     print("\n" + "="*30)
     print(f"Upload Complete. Success: {success_count}, Failed: {fail_count}, Skipped: {skipped_count}")
@@ -0,0 +1,34 @@
+import heapq
+
+
+class TopN:
+    """
+    Bounded min-heap of the n best items by score; on equal scores the lower rank
+    (earlier retrieval position) wins, matching a stable sort by score.
+    Use can_enter(upper_bound) to skip work for items that cannot make the cut.
+    """
+    def __init__(self, n):
+        self.n = n
+        self._heap = []  # (score, -rank, rank, item); root = current weakest entry
+
+    def __len__(self):
+        return len(self._heap)
+
+    @property
+    def full(self):
+        return len(self._heap) >= self.n
+
+    def can_enter(self, upper_bound):
+        """False once `upper_bound` is below the weakest kept score (ties may still win on rank)."""
+        return not self.full or upper_bound >= self._heap[0][0]
+
+    def push(self, score, rank, item):
+        entry = (score, -rank, rank, item)
+        if not self.full:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self):
+        """Kept items, best first (score desc, rank asc)."""
+        return [e[3] for e in sorted(self._heap, key=lambda e: (-e[0], e[2]))]
@@ -2,6 +2,50 @@
 import json
 import re
 
+# Output schema shared by parse() and parse_and_classify(); edit here so the prompts can't drift
+RESUME_SCHEMA = """{
+  "basics": {
+    "name": "Candidate Name (or Unknown)",
+    "email": "Email (or null)",
+    "phone": "Phone (or null)",
+    "total_years_experience": (Integer estimate based on career start year)
+  },
+  "skills": ["List", "of", "technical", "skills"],
+  "work_experience": [
+    {
+      "company": "Company Name",
+      "role": "Job Title",
+      "start_year": "YYYY",
+      "end_year": "YYYY (or Present)",
+      "description": "Brief summary of responsibilities"
+    }
+  ],
+  "education": [
+    {
+      "school": "School Name",
+      "degree": "Degree (BS, MS, PhD)",
+      "major": "Major"
+    }
+  ],
+  "summary": "A professional summary (3-4 sentences) effectively describing the candidate's core value proposition."{extra}
+}"""
+
+CLASSIFICATION_FIELD = """,
+  "classification": {
+    "position": "String (Must be from ALLOWED_ROLES)",
+    "domain": ["String", "String"],
+    "skills": ["String", "String"]
+  }"""
+
+def schema_instructions(extra_fields=""):
+    """[SCHEMA INSTRUCTIONS] prompt section; extra_fields is appended to the top-level object."""
+    schema = RESUME_SCHEMA.replace("{extra}", extra_fields)
+    return f"""[SCHEMA INSTRUCTIONS]
+Output JSON with the following structure:
+{schema}
+
+If a field is missing, use null or empty list."""
+
 class ResumeParser:
     def __init__(self, openai_client):
         self.client = openai_client
@@ -21,37 +65,51 @@ Be precise and factual. Do not hallucinate.
 [RESUME TEXT]
 {resume_text[:10000]}
 
-[SCHEMA INSTRUCTIONS]
-Output JSON with the following structure:
-{{
-  "basics": {{
-    "name": "Candidate Name (or Unknown)",
-    "email": "Email (or null)",
-    "phone": "Phone (or null)",
-    "total_years_experience": (Integer estimate based on career start year)
-  }},
-  "skills": ["List", "of", "technical", "skills"],
-  "work_experience": [
-    {{
-      "company": "Company Name",
-      "role": "Job Title",
-      "start_year": "YYYY",
-      "end_year": "YYYY (or Present)",
-      "description": "Brief summary of responsibilities"
-    }}
-  ],
-  "education": [
-    {{
-      "school": "School Name",
-      "degree": "Degree (BS, MS, PhD)",
-      "major": "Major"
-    }}
-  ],
-  "summary": "A professional summary (3-4 sentences) effectively describing the candidate's core value proposition."
-}}
+{schema_instructions()}
+"""
+        return self._run(prompt)
+
+    def parse_and_classify(self, resume_text: str, allowed_roles: list, allowed_domains: list) -> dict:
+        """
+        Single LLM call returning the parse() structure plus a "classification"
+        block ({"position", "domain", "skills"}) chosen from the allowed lists.
+        Callers should still run validate_role / validate_domains on the result.
+        """
+        if not resume_text:
+             return {}
+
+        roles_str = "\n".join([f"- {r}" for r in allowed_roles])
+        domains_str = "\n".join([f"- {d}" for d in allowed_domains])
+
+        prompt = f"""
+You are an expert Resume Parser and Headhunter AI.
+Extract structured data from the resume text below AND classify the candidate.
+Be precise and factual. Do not hallucinate.
 
-If a field is missing, use null or empty list.
+[RESUME TEXT]
+{resume_text[:10000]}
+
+[ALLOWED_ROLES]
+{roles_str}
+
+[ALLOWED_DOMAINS]
+{domains_str}
+
+[CLASSIFICATION RULES]
+1. position: You MUST select exactly ONE role from [ALLOWED_ROLES]. Do NOT invent new role names.
+   If multiple fit, choose the PRIMARY role. If none fit perfectly, choose the closest one.
+2. domain: Select ONE or MORE domains from [ALLOWED_DOMAINS]. Do NOT invent new domains.
+   Focus on the Industry/Problem Space (e.g. Automotive, Fintech). Technologies are NOT domains.
+3. skills: Key technical skills.
+
+{schema_instructions(CLASSIFICATION_FIELD)}
 """
+        parsed_data = self._run(prompt)
+        if parsed_data and not isinstance(parsed_data.get("classification"), dict):
+            parsed_data["classification"] = {}
+        return parsed_data
+
+    def _run(self, prompt: str) -> dict:
         try:
             # Use the existing JSON mode method in OpenAIClient
             parsed_data = self.client.get_chat_completion_json(prompt)
@@ -1,14 +1,45 @@
+import numpy as np
+from keyword_matcher import KeywordMatcher
+from candidate_text import CandidateText
+
+# Finance specialized bonus keywords
+FINANCE_ROLE_TERMS = ["finance", "fp&a", "재무", "회계", "accounting", "business analyst", "기획"]
+FINANCE_PLANNING_TERMS = ["budget", "forecast", "p&l", "financial model", "예산", "손익"]
+FINANCE_DATA_TERMS = ["excel", "sql", "data analysis", "bi", "데이터"]
+FINANCE_FPA_TERMS = ["fp&a", "경영기획", "재무기획", "business analyst"]
+FINANCE_INDUSTRY_TERMS = ["보험", "insurance", "fintech", "핀테크"]
+
+
+def build_jd_matcher(jd_analysis):
+    """
+    Compiles every keyword group used by Stage 2/3 for one JD.
+    Build once per search and pass matcher.scan(CandidateText(metadata)) to calculate_rpl / generate_explanation.
+    """
+    return KeywordMatcher({
+        "core": jd_analysis.get("must") or jd_analysis.get("core_signals") or [],
+        "support": jd_analysis.get("nice") or jd_analysis.get("supporting_signals") or [],
+        "context": jd_analysis.get("domain") or jd_analysis.get("context_signals") or [],
+        "finance_planning": FINANCE_PLANNING_TERMS,
+        "finance_data": FINANCE_DATA_TERMS,
+        "finance_fpa": FINANCE_FPA_TERMS,
+        "finance_industry": FINANCE_INDUSTRY_TERMS,
+        # explanation_engine uses the raw AI signals
+        "explain_core": jd_analysis.get("core_signals", []),
+        "explain_support": jd_analysis.get("supporting_signals", []),
+        "disqualifiers": jd_analysis.get("explicit_disqualifiers", []),
+    })
+
 
 def match_ratio(required_list, resume_text):
     if not required_list:
         return 1.0
     
-    resume_lower = str(resume_text).lower()
+    text = CandidateText.of(resume_text)
     hit_count = 0
     
     for req in required_list:
         # Simple substring match for now. Could be regex or fuzzy later.
-        if req.lower() in resume_lower:
+        if text.contains(req):
             hit_count += 1
             
     return hit_count / len(required_list)
@@ -17,36 +48,35 @@ def count_overlap(signal_list, resume_text):
     if not signal_list:
         return 0
         
-    resume_lower = str(resume_text).lower()
+    text = CandidateText.of(resume_text)
     hit_count = 0
     
     for sig in signal_list:
-        if sig.lower() in resume_lower:
+        if text.contains(sig):
             hit_count += 1
             
     return hit_count
 
 
-def calculate_rpl(jd_analysis, resume_metadata, vector_score=0.0):
+def calculate_rpl(jd_analysis, resume_metadata, vector_score=0.0, hits=None):
     """
     Calculates Resume Pass Likelihood (RPL) Score (0-100).
     [V6.0 Update]
     1. Keyword Sensitivity: Changed Max(Keyword, Semantic) to Weighted Average to ensure
        that missing verifiable keywords actually decreases the score.
     2. Legacy Compatibility: Use 'must', 'nice', 'domain' as fallbacks.
+    resume_metadata: metadata dict or its CandidateText.
+    hits: KeywordHits from build_jd_matcher(jd_analysis).scan(...) (computed here if omitted).
     """
-    resume_str = str(resume_metadata).lower()
+    if hits is None:
+        hits = build_jd_matcher(jd_analysis).scan(CandidateText.of(resume_metadata))
     
     # 1. Core Signals (Max 60) - Prioritize 'must' (user editable)
     core_signals = jd_analysis.get("must") or jd_analysis.get("core_signals") or []
     
     # Calculate Keyword Match Ratio
-    hit_count = 0
     if core_signals:
-        for req in core_signals:
-            if str(req).lower() in resume_str:
-                hit_count += 1
-        keyword_match_rate = hit_count / len(core_signals)
+        keyword_match_rate = hits.count("core") / len(core_signals)
     else:
         keyword_match_rate = 0.0
         
@@ -65,26 +95,10 @@ def calculate_rpl(jd_analysis, resume_metadata, vector_score=0.0):
     core_score = final_core_rate * 60
     
     # 2. Supporting Signals (Max 25) - Prioritize 'nice' (user editable)
-    supporting_signals = jd_analysis.get("nice") or jd_analysis.get("supporting_signals") or []
-    support_hits = 0
-    if supporting_signals:
-        for sig in supporting_signals:
-            if str(sig).lower() in resume_str:
-                support_hits += 1
-        support_score = min(support_hits * 5, 25)
-    else:
-        support_score = 0
+    support_score = min(hits.count("support") * 5, 25)
     
     # 3. Context Similarity (Max 10) - Prioritize 'domain' (user editable)
-    context_signals = jd_analysis.get("domain") or jd_analysis.get("context_signals") or []
-    context_hits = 0
-    if context_signals:
-        for sig in context_signals:
-            if str(sig).lower() in resume_str:
-                context_hits += 1
-        context_score = min(context_hits * 3, 10)
-    else:
-        context_score = 0
+    context_score = min(hits.count("context") * 3, 10)
     
     # 4. Refined Risk Penalty
     risk_penalty = 0 
@@ -92,18 +106,15 @@ def calculate_rpl(jd_analysis, resume_metadata, vector_score=0.0):
         risk_penalty += 20 # Steeper penalty for very low keyword match
 
     # ... (Finance specialized bonus remains unchanged) ...
-    jd_role = jd_analysis.get("canonical_role") or jd_analysis.get("role") or ""
-    jd_role = str(jd_role).lower()
-    
-    if any(x in jd_role for x in ["finance", "fp&a", "재무", "회계", "accounting", "business analyst", "기획"]):
+    if _is_finance_role(jd_analysis):
         finance_bonus = 0
-        if any(x in resume_str for x in ["budget", "forecast", "p&l", "financial model", "예산", "손익"]):
+        if hits.any("finance_planning"):
             finance_bonus += 15
-        if any(x in resume_str for x in ["excel", "sql", "data analysis", "bi", "데이터"]):
+        if hits.any("finance_data"):
             finance_bonus += 10
-        if any(x in resume_str for x in ["fp&a", "경영기획", "재무기획", "business analyst"]):
+        if hits.any("finance_fpa"):
             finance_bonus += 10
-        if "보험" in resume_str or "insurance" in resume_str or "fintech" in resume_str or "핀테크" in resume_str:
+        if hits.any("finance_industry"):
             finance_bonus += 5
             
         final_core_rate = min(1.0, final_core_rate + (finance_bonus / 100.0))
@@ -114,6 +125,86 @@ def calculate_rpl(jd_analysis, resume_metadata, vector_score=0.0):
     return max(10, min(100, int(final_score)))
 
 
+def _is_finance_role(jd_analysis):
+    jd_role = str(jd_analysis.get("canonical_role") or jd_analysis.get("role") or "").lower()
+    return any(x in jd_role for x in FINANCE_ROLE_TERMS)
+
+
+def score_batch(jd_analysis, candidates, vector_scores=None, hits=None):
+    """
+    Vectorized calculate_rpl over many candidates (identical scores).
+    candidates: metadata dicts or CandidateText; vector_scores: aligned floats (default 0.0).
+    hits: aligned KeywordHits from one build_jd_matcher(jd_analysis) (scanned here if omitted).
+    Builds a candidate x keyword hit matrix once; every RPL term is then an array op.
+    Returns a list of int scores.
+    """
+    n = len(candidates)
+    if n == 0:
+        return []
+    if hits is None:
+        matcher = build_jd_matcher(jd_analysis)
+        hits = [matcher.scan(c) for c in candidates]
+    matcher = hits[0].matcher
+
+    H = np.zeros((n, len(matcher.patterns)), dtype=bool)
+    rows = [i for i, h in enumerate(hits) for _ in h.found]
+    cols = [idx for h in hits for idx in h.found]
+    H[rows, cols] = True
+
+    def group_count(name):
+        idxs = [idx for _, idx in matcher.groups.get(name, [])]
+        return H[:, idxs].sum(axis=1) if idxs else np.zeros(n, dtype=np.int64)
+
+    def group_any(name):
+        return group_count(name) > 0
+
+    v = np.zeros(n) if vector_scores is None else np.asarray(vector_scores, dtype=np.float64)
+
+    # 1. Core Signals (Max 60)
+    core_signals = jd_analysis.get("must") or jd_analysis.get("core_signals") or []
+    sem_score = np.clip((v - 0.65) / 0.2, 0, 1.0)
+    if core_signals:
+        keyword_match_rate = group_count("core") / len(core_signals)
+        final_core_rate = (keyword_match_rate * 0.7) + (sem_score * 0.3)
+        risk_penalty = np.where(keyword_match_rate < 0.2, 20, 0)
+    else:
+        final_core_rate = sem_score
+        risk_penalty = np.zeros(n, dtype=np.int64)
+    core_score = final_core_rate * 60
+
+    # 2./3. Supporting (Max 25) & Context (Max 10)
+    support_score = np.minimum(group_count("support") * 5, 25)
+    context_score = np.minimum(group_count("context") * 3, 10)
+
+    # Finance specialized bonus
+    if _is_finance_role(jd_analysis):
+        finance_bonus = (group_any("finance_planning") * 15 + group_any("finance_data") * 10
+                         + group_any("finance_fpa") * 10 + group_any("finance_industry") * 5)
+        final_core_rate = np.minimum(1.0, final_core_rate + (finance_bonus / 100.0))
+        core_score = final_core_rate * 60
+
+    final_score = core_score + support_score + context_score - risk_penalty
+    return np.clip(np.trunc(final_score), 10, 100).astype(int).tolist()
+
+
+def rpl_upper_bound(jd_analysis, vector_scores):
+    """
+    Highest RPL each candidate could reach given only its vector score
+    (every keyword hit, full finance bonus, no risk penalty). Never below calculate_rpl.
+    """
+    v = np.asarray(vector_scores, dtype=np.float64)
+    sem_score = np.clip((v - 0.65) / 0.2, 0, 1.0)
+    core_signals = jd_analysis.get("must") or jd_analysis.get("core_signals") or []
+    supporting_signals = jd_analysis.get("nice") or jd_analysis.get("supporting_signals") or []
+    context_signals = jd_analysis.get("domain") or jd_analysis.get("context_signals") or []
+
+    final_core_rate = (0.7 + sem_score * 0.3) if core_signals else sem_score
+    if _is_finance_role(jd_analysis):
+        final_core_rate = np.minimum(1.0, final_core_rate + 0.40)
+    final_score = final_core_rate * 60 + min(len(supporting_signals) * 5, 25) + min(len(context_signals) * 3, 10)
+    return np.clip(np.trunc(final_score), 10, 100).astype(int).tolist()
+
+
 def calculate_pass_probability(rpl_score):
     """
     Converts RPL Score (0-100) to a Probability Percentage.
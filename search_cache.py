@@ -0,0 +1,116 @@
+import os
+import copy
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+INDEX_VERSION_PATH = os.environ.get("INDEX_VERSION_PATH", "index_version.json")
+DEFAULT_TTL = 1800  # seconds
+DEFAULT_MAX_ENTRIES = 64
+
+
+def bump_index_version(reason=""):
+    """Called by writers (ingest, cleanup) after the vector index changed; invalidates cached searches."""
+    stamp = {"version": time.time(), "reason": reason}
+    tmp = INDEX_VERSION_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(stamp, f)
+    os.replace(tmp, INDEX_VERSION_PATH)
+
+
+def current_index_version():
+    """Version stamp of the vector index (0 if never bumped)."""
+    try:
+        with open(INDEX_VERSION_PATH, "r", encoding="utf-8") as f:
+            return json.load(f).get("version", 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def canonical_hash(obj):
+    """Order-independent hash of JSON-like data (dict key order, set order ignored)."""
+    def normalize(o):
+        if isinstance(o, dict):
+            return {str(k): normalize(v) for k, v in o.items()}
+        if isinstance(o, (set, frozenset)):
+            return sorted((normalize(v) for v in o), key=lambda v: json.dumps(v, sort_keys=True, default=str))
+        if isinstance(o, (list, tuple)):
+            return [normalize(v) for v in o]
+        if isinstance(o, str):
+            return o.strip()
+        return o
+    raw = json.dumps(normalize(obj), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SearchResultCache:
+    """
+    In-process cache of (results, trace) per search.
+    Key = canonical hash of (JD analysis, query text, strategy, index host, namespaces) + index version,
+    so a finished ingest (bump_index_version) makes old entries unreachable.
+    """
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (stored_at, results, trace)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(jd_analysis, query_text, top_k, top_n=None, namespace="", host=""):
+        """namespace: the namespace (or list of namespaces) the search queries."""
+        return canonical_hash({
+            "jd": jd_analysis,
+            "query": query_text,
+            "top_k": top_k,
+            "top_n": top_n,
+            "host": host,
+            "namespace": namespace,
+            "index_version": current_index_version(),
+        })
+
+    def get(self, key):
+        """Returns (results, trace) copies, or None if missing/expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            results, trace = entry[1], entry[2]
+        # Callers annotate results (explanations, UI state); keep the cached copy clean
+        return copy.deepcopy(results), dict(trace)
+
+    def put(self, key, results, trace):
+        with self._lock:
+            self._entries[key] = (time.time(), copy.deepcopy(results), dict(trace))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_search_cache():
+    """Process-wide cache (survives Streamlit reruns)."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = SearchResultCache()
+        return _default_cache
@@ -1,6 +1,9 @@
 from typing import List, Dict, Any, Tuple
 from filters import HardFilter, MatrixFilter
 from matrices import get_matrix_for_role
+from ranking import TopN
+
+RANK_CHUNK = 50  # Candidates filtered/scored per batch before re-checking the top-N bound
 
 class SearchPipeline:
     def __init__(self, pinecone_client, open_ai_client):
@@ -8,7 +11,7 @@ class SearchPipeline:
         self.ai = open_ai_client
         self.hard_filter = HardFilter()
         
-    def run(self, jd_context: Dict[str, Any], query_text: str, top_k: int = 100, query_vector: List[float] = None) -> Tuple[List[Dict[str, Any]], List[str]]:
+    def run(self, jd_context: Dict[str, Any], query_text: str, top_k: int = 100, query_vector: List[float] = None, top_n: int = None) -> Tuple[List[Dict[str, Any]], List[str]]:
         logs = []
         logs.append(f"PIPELINE: Start (Query: {query_text[:50]}...)")
         
@@ -29,18 +32,51 @@ class SearchPipeline:
         if not candidates:
             return [], logs
 
+        # Stage 3 matrix is chosen up front so the ranking bound is known
+        matrix = get_matrix_for_role(jd_context)
+        logs.append(f"PIPELINE: Selected Matrix -> {matrix.name}")
+        matrix_filter = MatrixFilter(matrix)
+
+        if top_n:
+            # [v3.1] Bounded top-N: final_score <= vector*100 + max matrix score, so once the
+            # heap is full, chunks whose best bound can't beat its weakest entry are skipped.
+            max_matrix = sum(c.weight for c in matrix.competencies)
+            candidates.sort(key=lambda c: c.get('vector_score', 0), reverse=True)
+            top = TopN(top_n)
+            chunks = [candidates[i:i + RANK_CHUNK] for i in range(0, len(candidates), RANK_CHUNK)]
+            for n_done, chunk in enumerate(chunks):
+                if not top.can_enter(chunk[0].get('vector_score', 0) * 100 + max_matrix):
+                    logs.append(f"RANKING: Skipped {len(candidates) - n_done * RANK_CHUNK} candidates below top-{top_n} bound")
+                    break
+                for rank, cand in enumerate(self._filter_and_score(chunk, jd_context, matrix_filter, logs), start=n_done * RANK_CHUNK):
+                    top.push(cand['final_score'], rank, cand)
+            return top.items(), logs
+
+        candidates = self._filter_and_score(candidates, jd_context, matrix_filter, logs)
+        if not candidates:
+            return [], logs
+
+        # Sort by Final Score descending
+        candidates.sort(key=lambda x: x.get('final_score', 0), reverse=True)
+        
+        # Cutoff (optional, but let's keep top 50 for App to process)
+        # candidates = candidates[:50] 
+        
+        # Stage 5: AI Rerank (Placeholder - Return top candidates to App)
+        # In full refactor, AI Rerank would move here. For now, we return candidates to App.
+        
+        return candidates, logs
+
+    def _filter_and_score(self, candidates, jd_context, matrix_filter, logs):
+        """Stage 2 (Hard Filters) + Stage 3 (Matrix Scoring) + Stage 4 composite score."""
         # Stage 2: Hard Filters
         candidates, hf_logs = self.hard_filter.apply(candidates, jd_context)
         logs.extend(hf_logs)
         
         if not candidates:
-            return [], logs
+            return []
 
         # Stage 3: Matrix Scoring
-        matrix = get_matrix_for_role(jd_context)
-        logs.append(f"PIPELINE: Selected Matrix -> {matrix.name}")
-        
-        matrix_filter = MatrixFilter(matrix)
         candidates, mf_logs = matrix_filter.apply(candidates, jd_context)
         logs.extend(mf_logs)
         
@@ -57,17 +93,7 @@ class SearchPipeline:
             # Log significant penalties
             if penalty > 0:
                  logs.append(f"RANKING: {cand.get('id')} Final={final_score:.1f} (Vec={v_score:.1f} + Mat={m_score} - Pen={penalty})")
-
-        # Sort by Final Score descending
-        candidates.sort(key=lambda x: x.get('final_score', 0), reverse=True)
-        
-        # Cutoff (optional, but let's keep top 50 for App to process)
-        # candidates = candidates[:50] 
-        
-        # Stage 5: AI Rerank (Placeholder - Return top candidates to App)
-        # In full refactor, AI Rerank would move here. For now, we return candidates to App.
-        
-        return candidates, logs
+        return candidates
 
     def _convert_pinecone_results(self, res) -> List[Dict[str, Any]]:
         """Converts Pinecone response to internal candidate list format"""
@@ -1,14 +1,192 @@
+import time
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
-from resume_scoring import calculate_rpl, calculate_pass_probability
+from resume_scoring import score_batch, rpl_upper_bound, calculate_pass_probability, build_jd_matcher
+from ranking import TopN
 from explanation_engine import generate_explanation
+from fusion import aggregate_candidates
+from candidate_text import CandidateText
+
+# Populated-namespace map per index, discovered via describe_index_stats
+NAMESPACE_CACHE_TTL = 600  # seconds
+_namespace_cache = {}
+_namespace_lock = threading.Lock()
+
+# Used when stats are unavailable (old/custom clients): data lives in "ns1" (8000+ vectors)
+DEFAULT_NAMESPACES = ["ns1", ""]
+
+# Candidate-level retrieval: one summary + N experience vectors per candidate
+SCORE_AGGREGATION = "softmax"  # "max" | "softmax" | "sum" (see fusion.aggregate_candidates)
+OVERFETCH_FACTOR = 2           # Initial vectors requested per wanted candidate
+MAX_FETCH = 1000               # Pinecone top_k limit when metadata is included
+FETCH_BATCH = 100              # ids per fetch request
+
+# Explanations are generated for the top-N after sorting; the rest on demand via get_explanation()
+EXPLAIN_TOP_N = 20
+
+RANK_CHUNK = 64  # Candidates scanned/scored per batch before re-checking the top-N bound
+EXPLANATION_CACHE_SIZE = 5000
+_explanation_cache = OrderedDict()  # (jd_hash, candidate id, rpl_score) -> explanation text
+_explanation_lock = threading.Lock()
+
+
+def jd_fingerprint(jd_analysis):
+    """Stable hash of a JD analysis dict (key order independent)."""
+    return hashlib.md5(json.dumps(jd_analysis, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+def get_explanation(jd_analysis, result, hits=None, jd_hash=None):
+    """
+    Returns result['explanation'], generating it on first access.
+    Memoized per (jd hash, candidate id, rpl score) across searches.
+    """
+    if result.get("explanation") is not None:
+        return result["explanation"]
+    key = (jd_hash or jd_fingerprint(jd_analysis), result.get("id"), result.get("rpl_score"))
+    with _explanation_lock:
+        explanation = _explanation_cache.get(key)
+        if explanation is not None:
+            _explanation_cache.move_to_end(key)
+    if explanation is None:
+        explanation = generate_explanation(jd_analysis, result.get("data", {}), result.get("rpl_score", 0), hits=hits)
+        with _explanation_lock:
+            _explanation_cache[key] = explanation
+            while len(_explanation_cache) > EXPLANATION_CACHE_SIZE:
+                _explanation_cache.popitem(last=False)
+    result["explanation"] = explanation
+    return explanation
+
+
+def merge_namespace_results(responses, top_k):
+    """Merges query responses from several namespaces: dedupe by id (max score), re-sort, cut to top_k."""
+    best = {}
+    for res in responses:
+        for m in (res or {}).get("matches", []):
+            prev = best.get(m["id"])
+            if prev is None or m.get("score", 0) > prev.get("score", 0):
+                best[m["id"]] = m
+    if not best and all(r is None for r in responses):
+        return None
+    matches = sorted(best.values(), key=lambda m: m.get("score", 0), reverse=True)[:top_k]
+    return {"matches": matches}
+
 
 class SearchPipelineV3:
     def __init__(self, pinecone_client):
         self.pc = pinecone_client
 
-    def run(self, jd_analysis, query_vector, top_k=300):
+    def get_namespaces(self):
+        """Populated namespaces (largest first), cached per index for NAMESPACE_CACHE_TTL."""
+        key = getattr(self.pc, "host", None) or id(self.pc)
+        now = time.time()
+        with _namespace_lock:
+            cached = _namespace_cache.get(key)
+            if cached and now - cached[0] < NAMESPACE_CACHE_TTL:
+                return cached[1]
+
+        namespaces = None
+        if hasattr(self.pc, "describe_index_stats"):
+            try:
+                stats = self.pc.describe_index_stats() or {}
+                counts = {ns: info.get("vectorCount", 0) for ns, info in (stats.get("namespaces") or {}).items()}
+                populated = [ns for ns, cnt in sorted(counts.items(), key=lambda x: -x[1]) if cnt > 0]
+                if populated:
+                    namespaces = populated
+            except Exception as e:
+                print(f"Pipeline V3 Warning (describe_index_stats): {e}")
+
+        if namespaces is None:
+            return list(DEFAULT_NAMESPACES)  # Don't cache the fallback; retry discovery next time
+
+        with _namespace_lock:
+            _namespace_cache[key] = (now, namespaces)
+        return namespaces
+
+    def _query_namespace(self, query_vector, top_k, namespace, trace):
+        try:
+            return self.pc.query(vector=query_vector, top_k=top_k, namespace=namespace)
+        except TypeError as e:
+            # Fallback for old/custom client without namespace support
+            print(f"Pipeline V3 Warning (TypeError): {e}. Retrying without namespace.")
+            return self.pc.query(vector=query_vector, top_k=top_k)
+        except Exception as e:
+            print(f"Pipeline V3 Warning (Namespace '{namespace}'): {e}")
+            trace["warning"] = f"{namespace or 'default'} failed: {e}"
+            return None
+
+    def _search(self, query_vector, fetch_k, namespaces, trace):
+        # [V4.3] Query every populated namespace concurrently (usually just "ns1")
+        # instead of sequential ns1 -> "" -> None fallbacks.
+        if len(namespaces) == 1:
+            responses = [self._query_namespace(query_vector, fetch_k, namespaces[0], trace)]
+        else:
+            with ThreadPoolExecutor(max_workers=len(namespaces)) as executor:
+                responses = list(executor.map(
+                    lambda ns: self._query_namespace(query_vector, fetch_k, ns, trace), namespaces
+                ))
+        return merge_namespace_results(responses, fetch_k)
+
+    def _retrieve_candidates(self, query_vector, top_k, namespaces, trace):
+        """
+        Returns {'matches': [...]} with one entry per candidate (up to top_k).
+        Re-queries with a larger top_k while vectors-per-candidate crowd out distinct candidates.
+        """
+        fetch_k = min(MAX_FETCH, top_k * OVERFETCH_FACTOR)
+        trace["stage1_fetch_rounds"] = 0
+        while True:
+            raw = self._search(query_vector, fetch_k, namespaces, trace)
+            trace["stage1_fetch_rounds"] += 1
+            if not raw or "matches" not in raw:
+                return raw
+            vectors = raw["matches"]
+            candidates = aggregate_candidates(vectors, method=SCORE_AGGREGATION)
+            exhausted = len(vectors) < fetch_k
+            if len(candidates) >= top_k or exhausted or fetch_k >= MAX_FETCH:
+                break
+            # Grow by the observed vectors-per-candidate ratio (+20% margin)
+            ratio = len(vectors) / max(1, len(candidates))
+            fetch_k = min(MAX_FETCH, max(fetch_k * 2, int(top_k * ratio * 1.2)))
+
+        trace["stage1_vectors"] = len(vectors)
+        candidates = candidates[:top_k]
+        self._attach_summaries(candidates, namespaces)
+        return {"matches": candidates}
+
+    def _attach_summaries(self, candidates, namespaces):
+        """Fetches summary metadata once for candidates matched only through experience vectors."""
+        missing = {c["id"]: c for c in candidates if not c["has_summary"]}
+        if not missing or not hasattr(self.pc, "fetch"):
+            return
+        for ns in namespaces:
+            ids = list(missing)
+            for i in range(0, len(ids), FETCH_BATCH):
+                chunk = ids[i:i + FETCH_BATCH]
+                try:
+                    try:
+                        res = self.pc.fetch(ids=chunk, namespace=ns)
+                    except TypeError:
+                        res = self.pc.fetch(ids=chunk)
+                except Exception as e:
+                    print(f"Pipeline V3 Warning (Summary fetch): {e}")
+                    return
+                for vid, vec in ((res or {}).get("vectors") or {}).items():
+                    cand = missing.pop(vid, None)
+                    if cand is not None:
+                        cand["metadata"] = vec.get("metadata") or cand["metadata"]
+                        cand["has_summary"] = True
+            if not missing:
+                return
+
+    def run(self, jd_analysis, query_vector, top_k=300, top_n=None):
         """
         Executes the screening-oriented search pipeline.
+        top_n: keep only the best N by RPL (skips scoring candidates that cannot make it).
+            trace["rpl_scores"] then holds the score distribution of the untruncated
+            selection for cutline statistics (pruned candidates at their RPL upper bound).
         Returns: (final_results, trace_log)
         """
         trace = {
@@ -42,39 +220,22 @@ class SearchPipelineV3:
                 query_vector = query_vector[:768]
                 print("LOG: Truncated query vector from 1536 to 768 dim.")
 
+            namespaces = self.get_namespaces()
+
             print("=" * 60)
             print("[DEBUG] Pinecone Query")
             print(f"Query Vector (first 10): {query_vector[:10]}")
             print(f"Query Vector Dimension: {len(query_vector)}")
-            print(f"Namespace: ns1")
+            print(f"Namespaces: {namespaces}")
             print("=" * 60)
 
-            raw = None
-            try:
-                # [V4.2] Primary Namespace: "ns1"
-                # Debugging revealed data is in "ns1" (8000+ vectors).
-                raw = self.pc.query(
-                    vector=query_vector,
-                    top_k=top_k,
-                    namespace="ns1"
-                )
-            except TypeError as e:
-                 # Fallback for old/custom client
-                 # Try without namespace for older clients
-                 print(f"Pipeline V3 Warning (TypeError): {e}. Retrying without namespace.")
-                 raw = self.pc.query(
-                    vector=query_vector,
-                    top_k=top_k
-                )
-
-            except Exception as e_inner:
-                print(f"Pipeline V3 Warning (Namespace 'ns1'): {e_inner}")
-                trace["warning"] = f"ns1 failed: {e_inner}"
+            # [V4.4] Group summary/_exp_N vectors per candidate, over-fetching until top_k distinct
+            raw = self._retrieve_candidates(query_vector, top_k, namespaces, trace)
 
             print("=" * 60)
             print("[DEBUG] Pinecone Response")
             if raw and "matches" in raw:
-                print(f"Matches Found: {len(raw['matches'])}")
+                print(f"Candidates Found: {len(raw['matches'])} (from {trace.get('stage1_vectors', 0)} vectors)")
                 if raw['matches']:
                     print(f"Top Score: {raw['matches'][0].get('score')}")
                     print(f"Top Match ID: {raw['matches'][0].get('id')}")
@@ -82,28 +243,6 @@ class SearchPipelineV3:
                 print("Matches Found: 0 or Error")
             print("=" * 60)
 
-            # Fallback 1: Try Default Namespace ("") if ns1 failed
-            if not raw or not raw.get("matches"):
-                 try:
-                    print("LOG: Fallback to namespace ''")
-                    raw = self.pc.query(
-                        vector=query_vector,
-                        top_k=top_k,
-                        namespace=""
-                    )
-                 except Exception: pass
-                 
-            # Fallback 2: Try None (some libs treat None as default)
-            if not raw or not raw.get("matches"):
-                 try:
-                    print("LOG: Fallback to namespace None")
-                    raw = self.pc.query(
-                        vector=query_vector,
-                        top_k=top_k,
-                        namespace=None
-                    )
-                 except Exception: pass
-
         except Exception as e:
             print(f"Pipeline V3 Error (Vector Search): {e}")
             trace["error"] = str(e) # Capture error for UI
@@ -121,64 +260,95 @@ class SearchPipelineV3:
         trace["stage1_retrieved"] = len(candidates)
         
         # ---------------------------
-        # Stage 2: Explicit Disqualifier ONLY
+        # Stage 2 + 3: Explicit Disqualifier & RPL Scoring (Resume Pass Likelihood)
         # ---------------------------
-        disqualifiers = jd_analysis.get("explicit_disqualifiers", [])
+        # All JD keyword groups compiled once; each resume is scanned once and the
+        # hits are shared by the disqualifier check, RPL scoring and explanation.
+        matcher = build_jd_matcher(jd_analysis)
         
-        filtered = []
-        for c in candidates:
-            resume_text = str(c.get("metadata", {}))
-            
-            # Simple substring check for disqualifiers
-            is_disqualified = False
-            for d in disqualifiers:
-                if d.lower() in resume_text.lower():
-                    is_disqualified = True
-                    break
+        # [V3.4] Hybrid Scoring: Pass vector_score for semantic baseline
+        # [V4.4] 'score' is the aggregated retrieval score (softmax/sum can push it past the
+        # best cosine, even above 1) and only orders retrieval; RPL uses the raw best cosine.
+        vec_all = [c.get('vector_score', c.get('score', 0)) for c in candidates]
+        
+        # [V4.5] With top_n, candidates are processed in chunks by RPL upper bound
+        # (from vector score alone) into a bounded heap; once no remaining candidate can
+        # beat the weakest kept score, scanning/scoring stops.
+        upper = rpl_upper_bound(jd_analysis, vec_all)
+        order = sorted(range(len(candidates)), key=lambda i: (-upper[i], i))
+        top = TopN(top_n) if top_n else None
+        
+        scored = []  # (retrieval rank, candidate, hits, rpl_score)
+        all_scores = []  # (retrieval rank, rpl_score) for the top_n statistics
+        survivors = 0
+        for start in range(0, len(order), RANK_CHUNK):
+            chunk = order[start:start + RANK_CHUNK]
+            if top is not None and not top.can_enter(upper[chunk[0]]):
+                trace["stage3_skipped"] = len(order) - start
+                # Not scored: their (cheap) upper bound stands in for the statistics
+                all_scores.extend((i, int(upper[i])) for i in order[start:])
+                break
             
-            if is_disqualified:
-                continue  # ❗ Explicitly disqualified
-                
-            filtered.append(c)
+            kept = []
+            for i in chunk:
+                hits = matcher.scan(CandidateText(candidates[i].get("metadata", {})))
+                if hits.any("disqualifiers"):
+                    continue  # ❗ Explicitly disqualified
+                kept.append((i, hits))
+            survivors += len(kept)
             
-        trace["stage2_survivors"] = len(filtered)
+            # RPL for the whole chunk at once (vectorized; same scores as calculate_rpl)
+            rpl_scores = score_batch(
+                jd_analysis, [candidates[i].get("metadata", {}) for i, _ in kept],
+                [vec_all[i] for i, _ in kept], hits=[h for _, h in kept]
+            )
+            for (i, hits), rpl_score in zip(kept, rpl_scores):
+                if top is not None:
+                    all_scores.append((i, rpl_score))
+                    top.push(rpl_score, i, (i, candidates[i], hits, rpl_score))
+                else:
+                    scored.append((i, candidates[i], hits, rpl_score))
+        
+        trace["stage2_survivors"] = survivors
+        if top is not None:
+            # Same selection as the untruncated path below, so statistics don't depend on top_n
+            selected_scores = []
+            for _, rpl_score in sorted(all_scores):
+                if rpl_score >= 40 or len(selected_scores) < 50:
+                    selected_scores.append(rpl_score)
+            trace["rpl_scores"] = selected_scores
+        
+        if top is not None:
+            # Best first; below-cutline candidates only fill up to 50
+            scored = top.items()
+            n_keep = max(sum(1 for x in scored if x[3] >= 40), min(50, len(scored)))
+            scored = scored[:n_keep]
+        else:
+            # Keep if RPL > 40 (Screening Candidate) or we need to fill the list (retrieval order).
+            selected = []
+            for x in sorted(scored, key=lambda x: x[0]):
+                if x[3] >= 40 or len(selected) < 50:
+                    selected.append(x)
+            scored = selected
 
-        # ---------------------------------------
-        # Stage 3: RPL Scoring (Resume Pass Likelihood) & Explanation
-        # ---------------------------------------
         final_results = []
-        for candidate in filtered:
+        hits_by_id = {}
+        for i, candidate, hits, rpl_score in scored:
             try:
-                data = candidate.get("metadata", {})
                 cand_id = candidate.get("id")
                 
-                # [V3.4] Hybrid Scoring: Pass vector_score for semantic baseline
-                vec_score = candidate.get('score', 0) # Use 'score' from Pinecone match as vector_score
-                rpl_score = calculate_rpl(jd_analysis, data, vector_score=vec_score)
-                pass_prob = calculate_pass_probability(rpl_score)
-                
                 # Prepare candidate dict for final results
                 processed_candidate = {
                     "id": cand_id,
-                    "data": data,
+                    "data": candidate.get("metadata", {}),
                     "rpl_score": rpl_score,
-                    "pass_probability": pass_prob, # [New]
-                    "vector_score": vec_score,
-                    "explanation": None, # Initialize explanation as None
+                    "pass_probability": calculate_pass_probability(rpl_score), # [New]
+                    "vector_score": vec_all[i],
+                    "explanation": None, # Filled lazily (top-N below, others via get_explanation)
                     "ai_eval_score": rpl_score # Map to existing UI field for compatibility
                 }
-                
-                # [Step 4] Explanation Generation (Only for high potential or random sample)
-                # Generating explanation for ALL 300 candidates is too slow.
-                # Generate only if RPL > 40 (Screening Candidate) or we need to fill the list.
-                if rpl_score >= 40:
-                    explanation = generate_explanation(jd_analysis, data, rpl_score) # Pass rpl_score to explanation
-                    processed_candidate['explanation'] = explanation
-                    final_results.append(processed_candidate)
-                elif len(final_results) < 50: # Ensure we have at least some results even if low score
-                    explanation = generate_explanation(jd_analysis, data, rpl_score) # Pass rpl_score to explanation
-                    processed_candidate['explanation'] = explanation
-                    final_results.append(processed_candidate)
+                final_results.append(processed_candidate)
+                hits_by_id[cand_id] = hits
             except Exception as e:
                 print(f"[Warning] Candidate processing failed: {e}")
                 continue
@@ -188,9 +358,20 @@ class SearchPipelineV3:
         # ---------------------------
         # Stage 4: Sort
         # ---------------------------
-        # Sort by RPL Score descending
-        final_results.sort(key=lambda x: x["rpl_score"], reverse=True)
+        # Sort by RPL Score descending (already ordered when selected via heap)
+        if top is None:
+            final_results.sort(key=lambda x: x["rpl_score"], reverse=True)
         
         trace["stage4_final"] = len(final_results)
 
+        # [Step 4] Explanation Generation: only for the top-N actually shown first
+        # (generating for ALL 300 candidates is too slow and mostly unread).
+        jd_hash = jd_fingerprint(jd_analysis)
+        for result in final_results[:EXPLAIN_TOP_N]:
+            try:
+                get_explanation(jd_analysis, result, hits=hits_by_id.get(result["id"]), jd_hash=jd_hash)
+            except Exception as e:
+                print(f"[Warning] Explanation failed for {result.get('id')}: {e}")
+        trace["explained"] = min(len(final_results), EXPLAIN_TOP_N)
+
         return final_results, trace
@@ -1,10 +1,11 @@
 
 import os
 import time
-import json
 from connectors.notion_api import HeadhunterDB
 from connectors.pinecone_api import PineconeClient
 from classification_rules import get_role_cluster
+from search_cache import bump_index_version
+from ingest_manifest import IngestManifest, vector_base_id, legacy_vector_id
 
 def sync_notion_to_pinecone():
     print("Starting Notion <-> Pinecone Sync...")
@@ -12,19 +13,11 @@ def sync_notion_to_pinecone():
     # 1. Connect
     notion_db = HeadhunterDB()
     pinecone_client = PineconeClient()
+    manifest = IngestManifest()
     
     # 2. Setup Database ID
-    target_db_name = "Vector DB"
-    db_id = None
-    try:
-        with open("secrets.json", "r") as f:
-            secrets = json.load(f)
-            db_id = secrets.get("NOTION_DATABASE_ID")
-    except:
-        pass
-        
-    if not db_id:
-        db_id = notion_db.client.search_db_by_name(target_db_name)
+    # Resolved by the shared DatabaseRegistry: secrets.json, else notion_registry.json, else one search
+    db_id = notion_db.registry.resolve("candidates")
     
     if not db_id:
         print("Notion DB not found.")
@@ -84,12 +77,15 @@ def sync_notion_to_pinecone():
         # For now, we unfortunately have to rely on the fact that we might NOT be able to sync back 
         # UNLESS we stored the Vector ID in Notion or we can search Pinecone by metadata (slow/limited).
         
-        # ALTERNATIVE: main_ingest.py uses `generate_compact_id(name)`.
-        # If name hasn't changed, we can regenerate the ID.
-        
-        import hashlib
-        compact_id = hashlib.md5(name.encode()).hexdigest()[:10]
-        # This was the logic in main_ingest.py (simplified check)
+        # main_ingest keys vectors by the Notion page id (vector_base_id); the manifest knows
+        # the ids actually written. Not in the manifest = not re-ingested since the switch,
+        # so the vector is still under the old name-hash id.
+        entry = manifest.get(cand_id)
+        if entry is None:
+            compact_id = legacy_vector_id(name)
+        else:
+            compact_id = next((vid for vid in entry.get("vector_ids", []) if "_exp_" not in vid),
+                              vector_base_id(cand_id))
         
         # Let's try to fetch this vector
         try:
@@ -118,6 +114,8 @@ def sync_notion_to_pinecone():
         except Exception as e:
             print(f"  [!] Failed to sync {name}: {e}")
 
+    if updated_count:
+        bump_index_version("sync_notion_changes")
     print(f"Sync Complete. Updated {updated_count} candidates.")
 
 if __name__ == "__main__":
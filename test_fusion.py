@@ -0,0 +1,79 @@
+
+from fusion import fuse_results, candidate_key, aggregate_candidates
+from matcher import deduplicate_results
+from ranking import TopN
+import random
+
+def _m(vid, score, cand=None, vtype="summary"):
+    meta = {"type": vtype}
+    if cand:
+        meta["candidate_id"] = cand
+    return {"id": vid, "score": score, "metadata": meta}
+
+def test_deduplicate_keeps_max_score():
+    q1 = [_m("a", 0.9), _m("b", 0.5)]
+    q2 = [_m("b", 0.8), _m("c", 0.4)]
+    res = deduplicate_results([q1, q2])
+    assert [(m["id"], m["score"]) for m in res] == [("a", 0.9), ("b", 0.8), ("c", 0.4)]
+    print("✅ deduplicate_results keeps the max score per id")
+
+def test_collapse_experience_vectors():
+    assert candidate_key({"id": "abc_exp_3", "metadata": {}}) == "abc"
+    assert candidate_key({"id": "abc_exp_x", "metadata": {}}) == "abc_exp_x"
+    q1 = [_m("abc_exp_0", 0.9, "N1", "experience"), _m("abc", 0.7, "N1"), _m("def", 0.6, "N2")]
+    res = fuse_results([q1], strategy="max")
+    assert len(res) == 2
+    top = res[0]
+    # Summary vector's id/metadata represent the candidate; best cosine is kept
+    assert top["id"] == "abc" and top["score"] == 0.9 and top["matched_vectors"] == 2
+    print("✅ summary + _exp_N vectors collapse to one candidate")
+
+def test_rrf_rewards_consensus():
+    # "a" wins one query by a wide margin; "b" is 2nd in all three
+    q1 = [_m("a", 0.95), _m("b", 0.60)]
+    q2 = [_m("c", 0.70), _m("b", 0.65)]
+    q3 = [_m("d", 0.70), _m("b", 0.66)]
+    assert fuse_results([q1, q2, q3], strategy="max")[0]["id"] == "a"
+    res = fuse_results([q1, q2, q3], strategy="rrf")
+    assert res[0]["id"] == "b" and res[0]["hits"] == 3
+    assert all(0 < m["score"] <= 1 for m in res)
+    print("✅ RRF ranks cross-query consensus above a single high score")
+
+def test_weighted():
+    q1 = [_m("a", 0.9)]
+    q2 = [_m("b", 0.8)]
+    res = fuse_results([q1, q2], strategy="weighted", weights=[1.0, 3.0])
+    assert res[0]["id"] == "b"
+    assert abs(res[0]["score"] - 0.6) < 1e-9 and abs(res[1]["score"] - 0.225) < 1e-9
+    print("✅ Weighted fusion follows per-query weights")
+
+def test_aggregate_candidates():
+    matches = [_m("abc_exp_1", 0.80, "N1", "experience"), _m("def", 0.79, "N2"),
+               _m("abc_exp_0", 0.78, "N1", "experience"), _m("ghi_exp_0", 0.70, "N3", "experience")]
+    res = {m["id"]: m for m in aggregate_candidates(matches, method="softmax")}
+    assert set(res) == {"abc", "def", "ghi"}
+    # Two strong experiences beat a single summary hit; missing summary is flagged for fetch
+    assert res["abc"]["score"] > res["abc"]["vector_score"] == 0.80
+    assert not res["abc"]["has_summary"] and res["def"]["has_summary"]
+    assert aggregate_candidates(matches, method="max")[0]["score"] == 0.80
+    assert abs(aggregate_candidates(matches, method="sum")[0]["score"] - 1.58) < 1e-9
+    print("✅ Vectors aggregate to one entry per candidate")
+
+def test_top_n_matches_stable_sort():
+    random.seed(9)
+    scores = [random.randint(0, 20) for _ in range(500)]
+    top = TopN(25)
+    for rank, score in enumerate(scores):
+        top.push(score, rank, rank)
+    expected = sorted(range(len(scores)), key=lambda i: -scores[i])[:25]
+    assert top.items() == expected
+    assert not top.can_enter(min(scores[i] for i in expected) - 1)
+    print("✅ TopN heap selection equals a stable sort cut")
+
+if __name__ == "__main__":
+    test_deduplicate_keeps_max_score()
+    test_collapse_experience_vectors()
+    test_rrf_rewards_consensus()
+    test_weighted()
+    test_aggregate_candidates()
+    test_top_n_matches_stable_sort()
@@ -0,0 +1,65 @@
+
+import os
+import tempfile
+from ingest_manifest import IngestManifest, vector_base_id, legacy_vector_id
+from main_ingest import delete_legacy_vectors
+
+def test_shared_ids_survive_prune():
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = IngestManifest(os.path.join(tmp, "ingest_manifest.json"))
+        # Two same-name pages ingested by an older version share name-hash ids
+        manifest.record("page-a", "t1", "h1", ["abc", "abc_exp_0"], "v1")
+        manifest.record("page-b", "t1", "h2", ["abc", "abc_exp_0", "abc_exp_1"], "v1")
+
+        # page-b archived as a duplicate: only the id page-a doesn't own may be deleted
+        assert manifest.remove_missing(["page-a"]) == ["abc_exp_1"]
+
+        # page-a re-ingested under page-id keys: its old ids are now unowned -> stale
+        new_ids = [vector_base_id("page-a"), vector_base_id("page-a") + "_exp_0"]
+        assert manifest.record("page-a", "t2", "h3", new_ids, "v1") == ["abc", "abc_exp_0"]
+        assert manifest.remove_missing(["page-a"]) == []
+
+        manifest.save()
+        reloaded = IngestManifest(manifest.path)
+        assert reloaded.remove_missing([]) == new_ids
+    print("✅ Vector ids still owned by a live candidate are never returned for deletion")
+
+def test_stale_ids_on_reingest():
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = IngestManifest(os.path.join(tmp, "ingest_manifest.json"))
+        manifest.record("p1", "t1", "h1", ["p1", "p1_exp_0", "p1_exp_1"], "v1")
+        assert manifest.record("p1", "t2", "h2", ["p1", "p1_exp_0"], "v1") == ["p1_exp_1"]
+    print("✅ Experience vectors dropped by a re-ingest are reported as stale")
+
+class FakePinecone:
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.fetched = 0
+
+    def fetch(self, ids, namespace="ns1"):
+        self.fetched += 1
+        return {"vectors": {vid: self.vectors[vid] for vid in ids if vid in self.vectors}}
+
+    def delete(self, ids=None, namespace="ns1"):
+        for vid in ids:
+            self.vectors.pop(vid)
+        return {}
+
+def test_legacy_vectors_deleted_by_owner():
+    base = legacy_vector_id("Kim")
+    # page-b was written last under the shared name; page-a only keeps its extra experience
+    vectors = {base: {"metadata": {"candidate_id": "page-b"}}}
+    vectors.update({f"{base}_exp_{i}": {"metadata": {"candidate_id": "page-b"}} for i in range(25)})
+    vectors[f"{base}_exp_25"] = {"metadata": {"candidate_id": "page-a"}}
+    pinecone = FakePinecone(vectors)
+
+    assert delete_legacy_vectors(pinecone, "page-a", "Kim") == 1
+    assert len(pinecone.vectors) == 26 and pinecone.fetched == 2
+    assert delete_legacy_vectors(pinecone, "page-b", "Kim") == 26
+    assert not pinecone.vectors
+    print("✅ Legacy name-hash vectors are only deleted by the candidate they belong to")
+
+if __name__ == "__main__":
+    test_shared_ids_survive_prune()
+    test_stale_ids_on_reingest()
+    test_legacy_vectors_deleted_by_owner()
@@ -0,0 +1,69 @@
+
+import time
+import threading
+from ingest_pipeline import Stage, StreamingPipeline
+
+def test_end_of_stream_with_batches():
+    out = []
+    lock = threading.Lock()
+
+    def collect(item):
+        with lock:
+            out.append(item)
+
+    pipeline = StreamingPipeline([
+        Stage("double", lambda x: x * 2, workers=3),
+        Stage("batch", lambda items: [x + 1 for x in items], workers=2, batch_size=4, batch_timeout=0.05),
+        Stage("sink", collect, workers=2),
+    ])
+    report = pipeline.run(iter(range(50)))  # Returns only once every stage saw end-of-stream
+    assert sorted(out) == [x * 2 + 1 for x in range(50)]
+    assert [m["in"] for m in report["stages"]] == [50, 50, 50]
+    print("✅ All items flow through; end-of-stream reaches every worker of every stage")
+
+def test_backpressure_bounds_in_flight():
+    produced = [0]
+    consumed = [0]
+    max_ahead = [0]
+
+    def source():
+        for i in range(40):
+            produced[0] += 1
+            max_ahead[0] = max(max_ahead[0], produced[0] - consumed[0])
+            yield i
+
+    def slow_sink(item):
+        time.sleep(0.005)
+        consumed[0] += 1
+
+    pipeline = StreamingPipeline([
+        Stage("pass", lambda x: x, workers=1, queue_size=2),
+        Stage("sink", slow_sink, workers=1, queue_size=2),
+    ])
+    pipeline.run(source())
+    # 2 queues of 2 + one item per worker + the one the source is blocked on
+    assert max_ahead[0] <= 7, max_ahead[0]
+    print(f"✅ Bounded queues block the source (at most {max_ahead[0]} items ahead of the sink)")
+
+def test_batch_failure_isolated_per_item():
+    out = []
+
+    def fragile(items):
+        if any(x == 13 for x in items):
+            raise ValueError("bad item")
+        return items
+
+    pipeline = StreamingPipeline([
+        Stage("batch", fragile, workers=1, batch_size=8, batch_timeout=0.05),
+        Stage("sink", out.append, workers=1),
+    ])
+    report = pipeline.run(iter(range(20)))
+    batch = report["stages"][0]
+    assert sorted(out) == [x for x in range(20) if x != 13]
+    assert batch["errors"] == 1 and batch["in"] == 20 and batch["out"] == 19, batch
+    print("✅ A failing batch is retried per item: only the bad item is dropped and counted")
+
+if __name__ == "__main__":
+    test_end_of_stream_with_batches()
+    test_backpressure_bounds_in_flight()
+    test_batch_failure_isolated_per_item()
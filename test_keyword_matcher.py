@@ -0,0 +1,49 @@
+
+from keyword_matcher import KeywordMatcher
+from candidate_text import CandidateText
+import random
+from resume_scoring import calculate_rpl, build_jd_matcher, score_batch
+
+def test_matches_substring_semantics():
+    matcher = KeywordMatcher({"core": ["Java", "JavaScript", "결제", "Go"], "nice": ["java", "k8s"]})
+    hits = matcher.scan("{'skills': ['JavaScript', 'PG 결제']}")
+    assert hits.matched("core") == ["Java", "JavaScript", "결제"]  # 'java' is inside 'javascript'
+    assert hits.count("nice") == 1 and hits.any("nice")
+    assert not hits.any("missing_group")
+    assert len(matcher.patterns) == 5  # 'Java' / 'java' share one pattern
+    print("✅ KeywordMatcher follows case-insensitive substring semantics")
+
+def test_shared_hits_match_standalone_rpl():
+    jd = {"must": ["Python", "AWS"], "nice": ["Kafka"], "domain": ["Fintech"], "role": "Backend"}
+    meta = {"summary": "Python backend on AWS for a fintech startup", "skills": ["Kafka"]}
+    hits = build_jd_matcher(jd).scan(str(meta))
+    assert calculate_rpl(jd, meta, 0.8, hits=hits) == calculate_rpl(jd, meta, 0.8)
+    print("✅ calculate_rpl gives the same score with precomputed hits")
+
+def test_candidate_text():
+    meta = {"title": "Senior Product Manager", "skills": ["Python", "SQL"], "summary": "Python개발자, C++ / node.js"}
+    text = CandidateText(meta)
+    assert text.text == str(meta).lower()
+    assert text.compact("title") == "seniorproductmanager"
+    assert "sql" in text.items("skills") and "sq" not in text.items("skills")
+    assert text.contains("Node.JS") and text.contains("c++")
+    assert CandidateText.of(text) is text and text.get("title") == meta["title"]
+    print("✅ CandidateText fields, items and containment")
+
+def test_score_batch_matches_calculate_rpl():
+    random.seed(4)
+    vocab = ["Python", "AWS", "Kafka", "결제", "budget", "SQL", "보험", "fp&a"]
+    for role in ["Backend Engineer", "재무기획"]:
+        jd = {"must": vocab[:3], "nice": vocab[3:6], "domain": ["Fintech", "보험"], "role": role}
+        metas = [{"summary": " ".join(random.sample(vocab, random.randint(0, 6)))} for _ in range(200)]
+        scores = [random.uniform(0.5, 0.95) for _ in metas]
+        expected = [calculate_rpl(jd, m, s) for m, s in zip(metas, scores)]
+        assert score_batch(jd, metas, scores) == expected
+    assert score_batch(jd, []) == []
+    print("✅ score_batch reproduces calculate_rpl")
+
+if __name__ == "__main__":
+    test_matches_substring_semantics()
+    test_shared_hits_match_standalone_rpl()
+    test_candidate_text()
+    test_score_batch_matches_calculate_rpl()
@@ -0,0 +1,146 @@
+
+import os
+import time
+import random
+import tempfile
+from connectors.local_index import LocalVectorIndex
+from connectors.metadata_filter import ColumnStore, compile_filter, match_row
+
+DIM = 32
+
+def _rand_vec():
+    return [random.uniform(-1, 1) for _ in range(DIM)]
+
+def _build_index(n=500):
+    index = LocalVectorIndex(dimension=DIM)
+    vectors = []
+    for i in range(n):
+        vectors.append({
+            "id": f"cand{i}",
+            "values": _rand_vec(),
+            "metadata": {
+                "name": f"Candidate {i}",
+                "total_years": i % 15,
+                "role_cluster": "TECH_PLATFORM" if i % 3 == 0 else "TECH_CLIENT",
+                "domain": ["Fintech"] if i % 2 == 0 else ["Game", "AI / ML"],
+            }
+        })
+    index.upsert(vectors)
+    return index, vectors
+
+def test_query_matches_brute_force():
+    random.seed(7)
+    index, vectors = _build_index()
+    query = _rand_vec()
+
+    res = index.query(query, top_k=10)
+    ids = [m["id"] for m in res["matches"]]
+
+    def cosine(a, b):
+        dot = sum(x * y for x, y in zip(a, b))
+        na = sum(x * x for x in a) ** 0.5
+        nb = sum(x * x for x in b) ** 0.5
+        return dot / (na * nb)
+
+    expected = sorted(vectors, key=lambda v: cosine(query, v["values"]), reverse=True)[:10]
+    assert ids == [v["id"] for v in expected], (ids, [v["id"] for v in expected])
+    print("✅ Top-k matches brute-force cosine ranking")
+
+def test_fetch_delete_and_namespaces():
+    random.seed(1)
+    index, vectors = _build_index(50)
+
+    fetched = index.fetch(["cand3"])["vectors"]["cand3"]
+    assert all(abs(a - b) < 1e-4 for a, b in zip(fetched["values"], vectors[3]["values"]))
+
+    index.delete(ids=["cand3"])
+    assert "cand3" not in index.fetch(["cand3"])["vectors"]
+    assert all(m["id"] != "cand3" for m in index.query(vectors[3]["values"], top_k=50)["matches"])
+
+    assert index.query(_rand_vec(), top_k=5, namespace="")["matches"] == []
+    index.upsert([{"id": "x", "values": _rand_vec(), "metadata": {}}], namespace="")
+    assert index.query(_rand_vec(), top_k=5, namespace=None)["matches"][0]["id"] == "x"
+    print("✅ fetch / delete / namespace handling")
+
+def test_filter():
+    random.seed(3)
+    index, _ = _build_index()
+    flt = {"total_years": {"$gte": 5}, "role_cluster": {"$eq": "TECH_PLATFORM"}}
+    matches = index.query(_rand_vec(), top_k=300, filter_meta=flt)["matches"]
+    assert matches
+    for m in matches:
+        assert m["metadata"]["total_years"] >= 5 and m["metadata"]["role_cluster"] == "TECH_PLATFORM"
+    print(f"✅ Filtered query returned {len(matches)} matches, all satisfying the filter")
+
+def test_compiled_filter_matches_row_semantics():
+    random.seed(11)
+    metadata = []
+    for i in range(300):
+        meta = {"total_years": random.choice([None, 0, 3, 5, 7.5, 12]),
+                "role_cluster": random.choice([None, "TECH_PLATFORM", "TECH_CLIENT", "DESIGN"]),
+                "domain": random.choice([None, [], ["Fintech"], ["Game", "AI / ML"], ["Fintech", "Game"]]),
+                "mixed": random.choice([None, 3, "3", ["3"]])}
+        metadata.append({k: v for k, v in meta.items() if v is not None})
+    store = ColumnStore(metadata)
+
+    filters = [
+        {"total_years": {"$gte": 5}},
+        {"total_years": {"$lt": 5}, "role_cluster": {"$ne": "DESIGN"}},
+        {"total_years": {"$in": [3, 12]}},
+        {"total_years": {"$nin": [3, 12]}},
+        {"role_cluster": "TECH_PLATFORM"},
+        {"role_cluster": {"$in": ["TECH_CLIENT", "DESIGN"]}},
+        {"domain": {"$eq": "Fintech"}},
+        {"domain": {"$nin": ["Game"]}},
+        {"domain": {"$gt": 1}},
+        {"mixed": {"$eq": "3"}},
+        {"$or": [{"domain": {"$in": ["AI / ML"]}}, {"total_years": {"$gt": 10}}]},
+        {"$and": [{"role_cluster": {"$ne": "TECH_CLIENT"}}, {"$or": [{"total_years": 0}, {"domain": "Game"}]}]},
+    ]
+    for flt in filters:
+        mask = compile_filter(flt)(store)
+        expected = [match_row(m, flt) for m in metadata]
+        assert mask.tolist() == expected, flt
+    print(f"✅ Compiled columnar filters agree with row-wise semantics ({len(filters)} filters)")
+
+def test_save_and_load():
+    random.seed(5)
+    index, _ = _build_index(100)
+    index.delete(ids=["cand0"])
+    query = _rand_vec()
+    before = index.query(query, top_k=5)["matches"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "local_index")
+        index.save(path)
+        loaded = LocalVectorIndex.load(path)
+        after = loaded.query(query, top_k=5)["matches"]
+        assert [m["id"] for m in before] == [m["id"] for m in after]
+        assert loaded.describe_index_stats()["totalVectorCount"] == 99
+        del loaded
+    print("✅ save / load round trip")
+
+def bench(n=10000, dim=768, queries=50):
+    index = LocalVectorIndex(dimension=dim)
+    index.upsert([{"id": str(i), "values": [random.random() for _ in range(dim)], "metadata": {"total_years": i % 20}}
+                  for i in range(n)])
+    q = [random.random() for _ in range(dim)]
+    t0 = time.time()
+    for _ in range(queries):
+        index.query(q, top_k=300)
+    print(f"⏱  {n} x {dim}: {(time.time() - t0) / queries * 1000:.2f} ms / query (top_k=300)")
+
+    flt = {"total_years": {"$gte": 18}}
+    index.query(q, top_k=300, filter_meta=flt)  # Builds the column once
+    t0 = time.time()
+    for _ in range(queries):
+        index.query(q, top_k=300, filter_meta=flt)
+    print(f"⏱  {n} x {dim}: {(time.time() - t0) / queries * 1000:.2f} ms / query (top_k=300, 10% selective filter)")
+
+if __name__ == "__main__":
+    test_query_matches_brute_force()
+    test_fetch_delete_and_namespaces()
+    test_filter()
+    test_compiled_filter_matches_row_semantics()
+    test_save_and_load()
+    bench()
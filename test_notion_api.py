@@ -0,0 +1,70 @@
+
+import io
+import json
+import urllib.error
+from contextlib import contextmanager
+from connectors.notion_api import NotionClient
+
+def _text_block(block_id, btype, text, has_children=False):
+    return {"id": block_id, "type": btype, "has_children": has_children,
+            btype: {"rich_text": [{"plain_text": text}]}}
+
+class FakeTransport:
+    """Serves blocks/{id}/children from a dict: block id -> list of result pages."""
+    def __init__(self, children, fail_on=None):
+        self.children = children
+        self.fail_on = fail_on  # (block_id, cursor) answered with a 502
+        self.urls = []
+
+    @contextmanager
+    def request(self, method, url, data=None, headers=None):
+        self.urls.append(url)
+        block_id = url.split("/blocks/")[1].split("/")[0]
+        cursor = url.split("start_cursor=")[1] if "start_cursor=" in url else None
+        if self.fail_on == (block_id, cursor):
+            raise urllib.error.HTTPError(url, 502, "Bad Gateway", {}, io.BytesIO(b""))
+        pages = self.children[block_id]
+        page = pages[int(cursor) if cursor else 0]
+        yield io.BytesIO(json.dumps(page).encode("utf-8"))
+
+def _page(results, next_index=None):
+    return {"results": results, "has_more": next_index is not None,
+            "next_cursor": str(next_index) if next_index is not None else None}
+
+CHILDREN = {
+    # 2 result pages at the top level (has_more / next_cursor)
+    "page": [
+        _page([_text_block("t1", "toggle", "Experience", has_children=True)], next_index=1),
+        _page([_text_block("p2", "paragraph", "Education"),
+               {"id": "sub", "type": "child_page", "has_children": True, "child_page": {"title": "Other"}}]),
+    ],
+    "t1": [_page([_text_block("l1", "bulleted_list_item", "Backend at A", has_children=True)])],
+    "l1": [_page([_text_block("l2", "paragraph", "Python, Kafka", has_children=True)])],
+    "l2": [_page([_text_block("l3", "paragraph", "too deep")])],
+    "sub": [_page([_text_block("x", "paragraph", "must not be read")])],
+}
+
+def _client(transport):
+    return NotionClient("token", transport=transport)
+
+def test_pagination_and_nesting():
+    transport = FakeTransport(CHILDREN)
+    text = _client(transport).get_page_full_text("page", max_depth=2)
+    # Children follow their parent; child_page is skipped; depth capped at max_depth
+    assert text.split("\n") == ["Experience", "Backend at A", "Python, Kafka", "Education"], text
+    assert any("start_cursor=1" in url for url in transport.urls)
+    assert not any("/blocks/sub/" in url or "/blocks/l2/" in url for url in transport.urls)
+
+    flat = _client(FakeTransport(CHILDREN)).get_page_full_text("page", recursive=False)
+    assert flat.split("\n") == ["Experience", "Education"]
+    print("✅ Block children paginated and nested blocks read in order (max_depth, child_page skipped)")
+
+def test_failure_returns_none():
+    # Second top-level page fails, and separately a nested fetch fails
+    assert _client(FakeTransport(CHILDREN, fail_on=("page", "1"))).get_page_full_text("page") is None
+    assert _client(FakeTransport(CHILDREN, fail_on=("l1", None))).get_page_full_text("page") is None
+    print("✅ A failed block request yields None, never a truncated body")
+
+if __name__ == "__main__":
+    test_pagination_and_nesting()
+    test_failure_returns_none()
@@ -0,0 +1,56 @@
+
+import os
+import tempfile
+from connectors.notion_registry import DatabaseRegistry
+
+class FakeClient:
+    """Counts Notion calls; 'DB' is the only database the search API finds."""
+    def __init__(self, accessible=True):
+        self.calls = []
+        self.accessible = accessible
+
+    def search_db_by_name(self, title):
+        self.calls.append(("search", title))
+        return "db-1" if title == "DB" else None
+
+    def get_database(self, db_id):
+        self.calls.append(("get", db_id))
+        if not self.accessible:
+            return None
+        return {"object": "database", "title": [{"plain_text": "DB"}],
+                "properties": {"이름": {"id": "title", "type": "title"}, "Domain": {"id": "d1", "type": "multi_select"}}}
+
+def test_search_once_then_cached():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "notion_registry.json")
+        first = FakeClient()
+        assert DatabaseRegistry(first, {}, path).resolve("candidates") == "db-1"
+        assert ("search", "Vector DB") in first.calls and ("search", "DB") in first.calls
+
+        # New process: no search, schema served from the snapshot
+        second = FakeClient()
+        registry = DatabaseRegistry(second, {}, path)
+        assert registry.resolve("candidates") == "db-1"
+        assert registry.schema("candidates")["Domain"]["type"] == "multi_select"
+        assert second.calls == []
+    print("✅ Database id resolved by search once, then served from the persisted registry")
+
+def test_secrets_first_and_stale_entry():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "notion_registry.json")
+        client = FakeClient()
+        assert DatabaseRegistry(client, {"NOTION_DATABASE_ID": "from-secrets"}, path).resolve("candidates") == "from-secrets"
+        assert client.calls == []
+
+        registry = DatabaseRegistry(FakeClient(), {}, path)
+        registry.resolve("candidates")
+        registry.entries["candidates"]["checked_at"] = 0  # Expired -> validated again
+        registry.client = FakeClient(accessible=False)
+        assert registry.resolve("candidates") == "db-1"
+        assert ("search", "DB") in registry.client.calls  # Fell back to the search API
+        assert "candidates" not in registry.entries
+    print("✅ secrets.json wins; an inaccessible cached id is dropped and searched again")
+
+if __name__ == "__main__":
+    test_search_once_then_cached()
+    test_secrets_first_and_stale_entry()
@@ -0,0 +1,64 @@
+
+import threading
+import urllib.error
+from connectors.rate_limit import RateLimitScheduler, AdaptiveConcurrency, is_retryable
+from connectors.http_transport import HTTPTransport
+
+def test_one_throttle_halves_once():
+    scheduler = RateLimitScheduler(limits={"openai": {"rate": 1000.0, "burst": 1000}})
+    limiter = AdaptiveConcurrency(scheduler, ["openai"], initial=16, maximum=16)
+    inside = threading.Barrier(17)
+    release = threading.Event()
+
+    def task():
+        with limiter.slot():
+            inside.wait()
+            release.wait()
+
+    threads = [threading.Thread(target=task) for _ in range(16)]
+    for t in threads:
+        t.start()
+    inside.wait()  # 16 tasks in flight
+    scheduler.on_throttled("openai", 0)
+    release.set()
+    for t in threads:
+        t.join()
+    assert limiter.limit == 8, limiter.limit
+    print("✅ One 429 with 16 tasks in flight halves the limit once (16 -> 8)")
+
+def test_retry_policy():
+    assert is_retryable(429, "POST", "/v1/pages")
+    assert not is_retryable(502, "POST", "/v1/pages")  # create_page may have been applied
+    assert is_retryable(502, "GET", "/v1/blocks/x/children")
+    assert is_retryable(503, "POST", "/v1/databases/abc/query")
+    assert is_retryable(504, "POST", "/v1/embeddings")
+    assert not is_retryable(500, "GET", "/v1/pages/x")
+    print("✅ 5xx retried only for idempotent requests, 429 for all")
+
+def test_transport_does_not_repeat_writes():
+    scheduler = RateLimitScheduler(limits={"notion": {"rate": 1000.0, "burst": 1000}})
+    scheduler.backoff_delay = lambda attempt, headers=None: 0.0
+    transport = HTTPTransport(scheduler=scheduler)
+    calls = []
+
+    def fake_once(pool, method, path, data, headers):
+        calls.append((method, path))
+        return (502, {}, b"bad gateway") if len(calls) == 1 else (200, {}, b"{}")
+    transport._request_once = fake_once
+
+    try:
+        transport.request("POST", "https://api.notion.com/v1/pages", data=b"{}")
+        assert False, "expected HTTPError"
+    except urllib.error.HTTPError as e:
+        assert e.code == 502
+    assert len(calls) == 1
+
+    calls.clear()
+    transport.request("POST", "https://api.notion.com/v1/databases/abc/query?filter_properties=title", data=b"{}")
+    assert len(calls) == 2
+    print("✅ Transport retries a 502 query but not a 502 create_page")
+
+if __name__ == "__main__":
+    test_one_throttle_halves_once()
+    test_retry_policy()
+    test_transport_does_not_repeat_writes()
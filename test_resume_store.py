@@ -0,0 +1,41 @@
+
+import os
+import tempfile
+from connectors.resume_store import ResumeStore
+
+def test_roundtrip_and_freshness():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResumeStore(os.path.join(tmp, "resume_store.db"))
+        body = "백엔드 개발자 경력 7년\n" * 200
+        store.put("1234-abcd", body, url="https://www.notion.so/1234abcd", last_edited_time="2024-01-01T00:00:00.000Z")
+
+        entry = store.get("1234abcd")
+        assert entry["text"] == body and entry["url"] == "https://www.notion.so/1234abcd"
+        assert store.get("1234-abcd", last_edited_time="2024-01-01T00:00:00.000Z") is not None
+        assert store.get("1234-abcd", last_edited_time="2024-02-01T00:00:00.000Z") is None
+
+        # Partial update keeps the stored body
+        store.touch("1234-abcd", "2024-02-01T00:00:00.000Z")
+        store.put("1234-abcd", url="https://www.notion.so/new")
+        entry = store.get("1234-abcd", last_edited_time="2024-02-01T00:00:00.000Z")
+        assert entry["text"] == body and entry["url"] == "https://www.notion.so/new"
+        store._conn.close()
+    print("✅ Store round trip, partial update and last_edited_time freshness check")
+
+def test_get_many_and_prune():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResumeStore(os.path.join(tmp, "resume_store.db"))
+        for i in range(5):
+            store.put(f"page-{i}", f"text {i}")
+        found = store.get_many([f"page-{i}" for i in range(7)])
+        assert sorted(found) == [f"page-{i}" for i in range(5)]
+        assert found["page-3"]["text"] == "text 3"
+
+        assert store.remove_missing(["page-0", "page-1"]) == 3
+        assert store.stats()["entries"] == 2
+        store._conn.close()
+    print("✅ get_many / remove_missing")
+
+if __name__ == "__main__":
+    test_roundtrip_and_freshness()
+    test_get_many_and_prune()